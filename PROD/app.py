@@ -1,4 +1,5 @@
 import os
+import json
 import sqlite3
 import logging
 import requests 
@@ -10,6 +11,7 @@ import time
 from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor, wait
 from logging.handlers import RotatingFileHandler
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -21,9 +23,23 @@ except ImportError:
     # python-dotenv not installed, skip loading .env file
     pass
 
+# Быстрая JSON-сериализация для API (опционально)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Хэши argon2 пишет модульное приложение (app/) в ту же таблицу users
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    _password_hasher = PasswordHasher()
+except ImportError:
+    _password_hasher = None
+
 from flask import (
     Flask, render_template, render_template_string, request, redirect,
-    url_for, flash, session, abort
+    url_for, flash, session, abort, Response, g, has_request_context
 )
 from jinja2 import DictLoader, ChoiceLoader
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -166,14 +182,20 @@ CURRENCIES = {
     "GEL": {"symbol": "₾", "label": "Лари"},
 }
 DEFAULT_CURRENCY = "RUB"
+# Символы валют: один поиск по ключу и для проверки кода, и для символа
+CURRENCY_SYMBOLS = {code: info["symbol"] for code, info in CURRENCIES.items()}
 # Кэш курсов валют
 EXR_CACHE_TTL_SECONDS = int(os.environ.get("EXR_CACHE_TTL_SECONDS", str(12 * 3600)))  # 12 часов
 EXR_BRIDGE = os.environ.get("EXR_BRIDGE", "USD").upper()  # промежуточная валюта для кросс-курса
+# Готовый ответ /api/exchange-rates держим в памяти процесса (курсы общие для всех пользователей)
+EXR_RESPONSE_TTL_SECONDS = 3600
+EXR_FETCH_BUDGET_SECONDS = 10  # общий лимит на догрузку недостающих пар за один запрос
+_exr_rates_cache = {"expires": 0.0, "rates": None}
 @app.context_processor
 def inject_currency():
     code = session.get("currency", DEFAULT_CURRENCY)
-    info = CURRENCIES.get(code, CURRENCIES[DEFAULT_CURRENCY])
-    return dict(currency_code=code, currency_symbol=info["symbol"], currencies=CURRENCIES)
+    symbol = CURRENCY_SYMBOLS.get(code) or CURRENCY_SYMBOLS[DEFAULT_CURRENCY]
+    return dict(currency_code=code, currency_symbol=symbol, currencies=CURRENCIES)
 
 # -----------------------------------------------------------------------------
 # Currency conversion helper
@@ -313,6 +335,23 @@ def convert_currency(amount, from_currency, to_currency):
         app.logger.error(f"Currency conversion error: {e}")
         return amount
 
+# -----------------------------------------------------------------------------
+# JSON responses
+# -----------------------------------------------------------------------------
+def _json_default(obj):
+    """Сериализация типов, которые orjson/json не знают."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def json_response(payload, status=200):
+    """JSON-ответ для горячих API: orjson если установлен, иначе stdlib json."""
+    if orjson is not None:
+        body = orjson.dumps(payload, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        body = json.dumps(payload, default=_json_default, ensure_ascii=False)
+    return Response(body, status=status, mimetype='application/json')
+
 # -----------------------------------------------------------------------------
 # Jinja filters
 # -----------------------------------------------------------------------------
@@ -411,15 +450,68 @@ def generate_months_list(current_month=None):
     
     return months
 
+def verify_password(password_hash, password):
+    """Проверка пароля: argon2 (от app/) или werkzeug."""
+    if password_hash.startswith("$argon2"):
+        if _password_hasher is None:
+            app.logger.error("argon2-cffi не установлен, argon2-хэш не проверить")
+            return False
+        try:
+            return _password_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(password_hash, password)
+
 # -----------------------------------------------------------------------------
 # DB helpers
 # -----------------------------------------------------------------------------
-def get_db():
-    conn = sqlite3.connect(DB_PATH)
+class RequestConnection(sqlite3.Connection):
+    """Соединение, переиспользуемое в пределах запроса.
+
+    get_db() выдаёт его, только пока его никто не держит. close() откатывает
+    незакоммиченное, как настоящее закрытие, и освобождает соединение для
+    следующего get_db(). Вложенный get_db() (хелпер внутри обработчика)
+    получает отдельное соединение, так что commit/rollback хелпера не
+    затрагивают транзакцию вызывающего. По-настоящему закрывает close_db.
+    """
+
+    leased = False
+
+    def close(self):
+        if self.leased:
+            self.rollback()
+            self.leased = False
+
+
+def _connect(factory=sqlite3.Connection):
+    conn = sqlite3.connect(DB_PATH, factory=factory)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA cache_size = -64000")
+    return conn
+
+
+def get_db():
+    # Вне запроса (миграции при старте) — отдельное соединение
+    if not has_request_context():
+        return _connect()
+    conn = g.get("_db")
+    if conn is None:
+        conn = g._db = _connect(RequestConnection)
+    if conn.leased:
+        return _connect()
+    conn.leased = True
     return conn
 
+
+@app.teardown_appcontext
+def close_db(exc):
+    conn = g.pop("_db", None)
+    if conn is not None:
+        conn.rollback()
+        sqlite3.Connection.close(conn)
+
 def safe_get_row_value(row, key, default=None):
     """Безопасно получить значение из sqlite3.Row"""
     try:
@@ -430,6 +522,8 @@ def safe_get_row_value(row, key, default=None):
 
 def init_db():
     conn = get_db()
+    # WAL сохраняется в файле БД, достаточно включить один раз
+    conn.execute("PRAGMA journal_mode = WAL")
     conn.executescript(
         """
         CREATE TABLE IF NOT EXISTS users (
@@ -578,6 +672,10 @@ def ensure_income_sources_tables():
       UNIQUE(user_id, category_id)
     )
     """)
+    # Поиск по (user_id, category_id) покрывает UNIQUE-индекс; для удаления
+    # источника/категории (в т.ч. каскадного) нужны индексы по FK-колонкам
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_scr_source ON source_category_rules(source_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_scr_category ON source_category_rules(category_id)")
     
     conn.commit()
     conn.close()
@@ -869,10 +967,11 @@ def internal_error(error):
 def set_currency():
     payload = request.get_json(silent=True) or {}
     code = (request.form.get("currency") or payload.get("currency") or "").upper()
-    if code in CURRENCIES:
+    symbol = CURRENCY_SYMBOLS.get(code)
+    if symbol is not None:
         session["currency"] = code
         if request.is_json:
-            return {"success": True, "currency": code, "symbol": CURRENCIES[code]["symbol"]}
+            return {"success": True, "currency": code, "symbol": symbol}
         flash("Валюта обновлена", "success")
     else:
         if request.is_json:
@@ -1126,7 +1225,7 @@ def login_email():
         conn = get_db()
         user = conn.execute("SELECT * FROM users WHERE email=? AND auth_type='email'", (email,)).fetchone()
         conn.close()
-        if user and check_password_hash(user["password_hash"], password):
+        if user and verify_password(user["password_hash"], password):
             session["user_id"] = user["id"]
             session["email"] = user["email"]
             session["name"] = user["name"]
@@ -1428,7 +1527,7 @@ def account_password():
 
     conn = get_db()
     user = conn.execute("SELECT password_hash FROM users WHERE id=?", (uid,)).fetchone()
-    if not user or not check_password_hash(user["password_hash"], old):
+    if not user or not verify_password(user["password_hash"], old):
         conn.close()
         flash("Текущий пароль неверный", "error")
         return redirect(url_for("account"))
@@ -2219,30 +2318,25 @@ def rules_bulk_update():
         source_id = int(v) if v.strip() else None
         pairs[cat_id] = source_id
 
+    upserts = [(uid, source_id, uid, cat_id, uid) for cat_id, source_id in pairs.items() if source_id]
+    deletes = [(uid, cat_id) for cat_id, source_id in pairs.items() if not source_id]
+
     conn = get_db()
-    # Проверка, что категории и источники принадлежат пользователю
-    for cat_id, source_id in pairs.items():
-        ok_cat = conn.execute("SELECT 1 FROM categories WHERE id=? AND user_id=?", (cat_id, uid)).fetchone()
-        if not ok_cat:
-            continue
-        existing = conn.execute(
-            "SELECT id FROM source_category_rules WHERE user_id=? AND category_id=?",
-            (uid, cat_id)
-        ).fetchone()
-        if source_id:
-            ok_src = conn.execute("SELECT 1 FROM income_sources WHERE id=? AND user_id=?", (source_id, uid)).fetchone()
-            if not ok_src:
-                continue
-            if existing:
-                conn.execute("UPDATE source_category_rules SET source_id=? WHERE id=?", (source_id, existing["id"]))
-            else:
-                conn.execute(
-                    "INSERT INTO source_category_rules(user_id, source_id, category_id) VALUES (?,?,?)",
-                    (uid, source_id, cat_id)
-                )
-        else:
-            if existing:
-                conn.execute("DELETE FROM source_category_rules WHERE id=?", (existing["id"],))
+    # Пакетный UPSERT по UNIQUE(user_id, category_id): строка вставляется,
+    # только если и категория, и источник принадлежат пользователю
+    conn.executemany(
+        """
+        INSERT INTO source_category_rules(user_id, source_id, category_id)
+        SELECT ?, s.id, c.id FROM income_sources s, categories c
+         WHERE s.id=? AND s.user_id=? AND c.id=? AND c.user_id=?
+        ON CONFLICT(user_id, category_id) DO UPDATE SET source_id=excluded.source_id
+        """,
+        upserts
+    )
+    conn.executemany(
+        "DELETE FROM source_category_rules WHERE user_id=? AND category_id=?",
+        deletes
+    )
     conn.commit()
     conn.close()
     flash("Привязки обновлены", "success")
@@ -2274,28 +2368,28 @@ def categories():
     # Получаем связи для многоисточниковых категорий  
     multi_source_links = {}
     multi_source_rows = conn.execute("""
-        SELECT category_id, source_id, percentage,
-               (SELECT name FROM income_sources WHERE id = cis.source_id) as source_name
+        SELECT cis.category_id, cis.source_id, cis.percentage, s.name as source_name
         FROM category_income_sources cis
-        WHERE user_id = ?
-        ORDER BY category_id, source_id
+        LEFT JOIN income_sources s ON s.id = cis.source_id
+        WHERE cis.user_id = ?
+        ORDER BY cis.category_id, cis.source_id
     """, (uid,)).fetchall()
+    conn.close()
     
     for link in multi_source_rows:
-        cat_id = link['category_id']
-        if cat_id not in multi_source_links:
-            multi_source_links[cat_id] = []
-        multi_source_links[cat_id].append({
+        multi_source_links.setdefault(link['category_id'], []).append({
             'source_id': link['source_id'],
             'source_name': link['source_name'],
             'percentage': float(link['percentage'])
         })
     
-    # Разделяем категории по типам
-    expense_categories = [cat for cat in rows if cat["category_type"] == "expense"]
-    income_categories = [cat for cat in rows if cat["category_type"] == "income"]
-    
-    conn.close()
+    # Разделяем категории по типам за один проход
+    expense_categories, income_categories = [], []
+    by_type = {"expense": expense_categories.append, "income": income_categories.append}
+    for cat in rows:
+        add = by_type.get(cat["category_type"])
+        if add:
+            add(cat)
     return render_template("categories.html", 
                          categories=rows, 
                          expense_categories=expense_categories,
@@ -2367,35 +2461,27 @@ def categories_add():
                     source_id_int = int(source_id_val)
                     percentage_float = float(percentage_val)
                     
-                    # Проверяем, что источник принадлежит пользователю
-                    valid_source = conn.execute(
-                        "SELECT 1 FROM income_sources WHERE id=? AND user_id=?",
-                        (source_id_int, uid)
-                    ).fetchone()
-                        
-                    if valid_source and 0 < percentage_float <= 100:
-                        conn.execute(
-                            "INSERT INTO category_income_sources(user_id, category_id, source_id, percentage) VALUES (?,?,?,?)",
-                            (uid, category_id, source_id_int, percentage_float)
-                        )
-                        app.logger.info(f"Добавлен источник {source_id_int} с процентом {percentage_float} для категории {category_id}")
+                    # Вставляем связь, только если источник принадлежит пользователю
+                    if 0 < percentage_float <= 100:
+                        inserted = conn.execute(
+                            "INSERT INTO category_income_sources(user_id, category_id, source_id, percentage) "
+                            "SELECT ?, ?, id, ? FROM income_sources WHERE id=? AND user_id=?",
+                            (uid, category_id, percentage_float, source_id_int, uid)
+                        ).rowcount
+                        if inserted:
+                            app.logger.info(f"Добавлен источник {source_id_int} с процентом {percentage_float} для категории {category_id}")
                 except (ValueError, TypeError):
                     pass
                     
                 i += 1
         elif source_id:
-            # Обычная категория - создаем привязку в старой таблице
-            # Проверяем, что источник принадлежит пользователю
-            valid_source = conn.execute(
-                "SELECT 1 FROM income_sources WHERE id=? AND user_id=?",
-                (source_id, uid)
-            ).fetchone()
-            
-            if valid_source:
-                conn.execute(
-                    "INSERT INTO source_category_rules(user_id, source_id, category_id) VALUES (?,?,?)",
-                    (uid, source_id, category_id)
-                )
+            # Обычная категория - создаем привязку в старой таблице,
+            # только если источник принадлежит пользователю (одним запросом)
+            conn.execute(
+                "INSERT INTO source_category_rules(user_id, source_id, category_id) "
+                "SELECT ?, id, ? FROM income_sources WHERE id=? AND user_id=?",
+                (uid, category_id, source_id, uid)
+            )
         
         conn.commit()
         flash("Категория добавлена", "success")
@@ -2440,37 +2526,23 @@ def categories_update(cat_id):
         (name, limit_type, val, cat_id, uid),
     )
     
-    # Обновляем привязку к источнику
-    existing_rule = conn.execute(
-        "SELECT id FROM source_category_rules WHERE user_id=? AND category_id=?",
-        (uid, cat_id)
-    ).fetchone()
-    
+    # Обновляем привязку к источнику одним запросом: UPSERT по UNIQUE(user_id, category_id),
+    # строка вставляется, только если источник принадлежит пользователю
     if source_id:
-        # Проверяем, что источник принадлежит пользователю
-        valid_source = conn.execute(
-            "SELECT 1 FROM income_sources WHERE id=? AND user_id=?",
-            (source_id, uid)
-        ).fetchone()
-        
-        if valid_source:
-            if existing_rule:
-                conn.execute(
-                    "UPDATE source_category_rules SET source_id=? WHERE id=?",
-                    (source_id, existing_rule["id"])
-                )
-            else:
-                conn.execute(
-                    "INSERT INTO source_category_rules(user_id, source_id, category_id) VALUES (?,?,?)",
-                    (uid, source_id, cat_id)
-                )
+        conn.execute(
+            """
+            INSERT INTO source_category_rules(user_id, source_id, category_id)
+            SELECT ?, id, ? FROM income_sources WHERE id=? AND user_id=?
+            ON CONFLICT(user_id, category_id) DO UPDATE SET source_id=excluded.source_id
+            """,
+            (uid, cat_id, source_id, uid)
+        )
     else:
         # Удаляем привязку, если источник не выбран
-        if existing_rule:
-            conn.execute(
-                "DELETE FROM source_category_rules WHERE id=?",
-                (existing_rule["id"],)
-            )
+        conn.execute(
+            "DELETE FROM source_category_rules WHERE user_id=? AND category_id=?",
+            (uid, cat_id)
+        )
     
     conn.commit()
     conn.close()
@@ -3784,6 +3856,90 @@ def health_check():
 # Analytics and Charts API
 # -----------------------------------------------------------------------------
 
+# SQL вынесен в константы: строка одна и та же на каждый запрос, поэтому
+# sqlite3 берёт подготовленный statement из своего кэша. Границы месяца
+# передаются параметрами (date >= ? AND date < ?), чтобы работал индекс по date.
+_SQL_MONTHLY_CHART = {
+    '6months': """
+    SELECT strftime('%Y-%m', date) as month, SUM(amount) as total
+    FROM expenses 
+    WHERE user_id = ? AND date >= date('now', '-6 months')
+    GROUP BY strftime('%Y-%m', date)
+    ORDER BY month
+    """,
+    'year': """
+    SELECT strftime('%Y-%m', date) as month, SUM(amount) as total
+    FROM expenses 
+    WHERE user_id = ? AND date >= date('now', '-1 year')
+    GROUP BY strftime('%Y-%m', date)
+    ORDER BY month
+    """,
+    'all': """
+    SELECT strftime('%Y-%m', date) as month, SUM(amount) as total
+    FROM expenses 
+    WHERE user_id = ?
+    GROUP BY strftime('%Y-%m', date)
+    ORDER BY month
+    """,
+}
+
+# Сначала агрегируем расходы месяца (range-scan по индексу), потом
+# присоединяем категории ради имён — пустые категории не участвуют в JOIN
+_SQL_CATEGORY_CHART = """
+SELECT c.name, COALESCE(e.total, 0) as total
+FROM categories c
+LEFT JOIN (
+    SELECT category_id, SUM(amount) AS total
+    FROM expenses
+    WHERE user_id = ? AND date >= ? AND date < ?
+    GROUP BY category_id
+) e ON e.category_id = c.id
+WHERE c.user_id = ?
+ORDER BY total DESC
+"""
+
+# TOTAL() всегда возвращает REAL (0.0 для пустых групп), процент считается в SQL
+_SQL_COMPARE = """
+SELECT
+    name,
+    current_month,
+    prev_month,
+    CASE WHEN prev_month > 0
+         THEN ROUND((current_month - prev_month) * 100.0 / prev_month, 1)
+         ELSE 0 END as change_percent
+FROM (
+    SELECT 
+        c.name,
+        TOTAL(CASE WHEN e.date >= ? THEN e.amount END) as current_month,
+        TOTAL(CASE WHEN e.date < ? THEN e.amount END) as prev_month
+    FROM categories c
+    LEFT JOIN expenses e ON c.id = e.category_id AND e.date >= ? AND e.date < ?
+    WHERE c.user_id = ?
+    GROUP BY c.id, c.name
+)
+ORDER BY current_month DESC
+"""
+
+def month_bounds():
+    """Границы текущего и прошлого месяца, считаются один раз за запрос.
+
+    Возвращает dict с ключами current/previous (YYYY-MM) и
+    prev_start/start/next_start (YYYY-MM-DD) — кэшируется в flask.g.
+    """
+    bounds = getattr(g, '_month_bounds', None)
+    if bounds is None:
+        start = datetime.now().date().replace(day=1)
+        prev_start = (start - timedelta(days=1)).replace(day=1)
+        next_start = (start + timedelta(days=32)).replace(day=1)
+        bounds = g._month_bounds = {
+            'current': start.strftime('%Y-%m'),
+            'previous': prev_start.strftime('%Y-%m'),
+            'prev_start': prev_start.isoformat(),
+            'start': start.isoformat(),
+            'next_start': next_start.isoformat(),
+        }
+    return bounds
+
 @app.route('/api/expenses/chart-data')
 @login_required
 def expenses_chart_data():
@@ -3797,109 +3953,63 @@ def expenses_chart_data():
         
         if chart_type == 'monthly':
             # Данные по месяцам за выбранный период
-            if period == '6months':
-                query = """
-                SELECT strftime('%Y-%m', date) as month, SUM(amount) as total
-                FROM expenses 
-                WHERE user_id = ? AND date >= date('now', '-6 months')
-                GROUP BY strftime('%Y-%m', date)
-                ORDER BY month
-                """
-            elif period == 'year':
-                query = """
-                SELECT strftime('%Y-%m', date) as month, SUM(amount) as total
-                FROM expenses 
-                WHERE user_id = ? AND date >= date('now', '-1 year')
-                GROUP BY strftime('%Y-%m', date)
-                ORDER BY month
-                """
-            else:  # all
-                query = """
-                SELECT strftime('%Y-%m', date) as month, SUM(amount) as total
-                FROM expenses 
-                WHERE user_id = ?
-                GROUP BY strftime('%Y-%m', date)
-                ORDER BY month
-                """
-            
+            query = _SQL_MONTHLY_CHART.get(period, _SQL_MONTHLY_CHART['all'])
             cursor = conn.execute(query, (user_id,))
             
         elif chart_type == 'category':
             # Данные по категориям за текущий месяц
-            query = """
-            SELECT c.name, COALESCE(SUM(e.amount), 0) as total
-            FROM categories c
-            LEFT JOIN expenses e ON c.id = e.category_id AND strftime('%Y-%m', e.date) = strftime('%Y-%m', 'now')
-            WHERE c.user_id = ?
-            GROUP BY c.id, c.name
-            ORDER BY total DESC
-            """
-            cursor = conn.execute(query, (user_id,))
+            bounds = month_bounds()
+            cursor = conn.execute(
+                _SQL_CATEGORY_CHART, (user_id, bounds['start'], bounds['next_start'], user_id)
+            )
             
-        data = [dict(row) for row in cursor.fetchall()]
+        # Одна dict на строку: имена колонок берём из cursor.description один раз,
+        # строки читаем прямо из курсора без промежуточного fetchall()
+        columns = [d[0] for d in cursor.description]
+        data = [dict(zip(columns, row)) for row in cursor]
         conn.close()
         
-        return {"success": True, "data": data}
+        return json_response({"success": True, "data": data})
         
     except Exception as e:
         app.logger.error(f"Error in expenses_chart_data: {e}")
-        return {"success": False, "error": str(e)}, 500
+        return json_response({"success": False, "error": str(e)}, 500)
 
 @app.route('/api/expenses/compare')
 @login_required
 def expenses_compare():
     """API для сравнения периодов."""
     try:
-        current_month = datetime.now().strftime('%Y-%m')
-        prev_month = (datetime.now().replace(day=1) - timedelta(days=1)).strftime('%Y-%m')
+        bounds = month_bounds()
+        current_month = bounds['current']
+        prev_month = bounds['previous']
         
         conn = get_db()
         user_id = session['user_id']
         
         # Сравнение текущего и предыдущего месяца по категориям
-        query = """
-        SELECT 
-            c.name,
-            COALESCE(SUM(CASE WHEN strftime('%Y-%m', e.date) = ? THEN e.amount ELSE 0 END), 0) as current_month,
-            COALESCE(SUM(CASE WHEN strftime('%Y-%m', e.date) = ? THEN e.amount ELSE 0 END), 0) as prev_month
-        FROM categories c
-        LEFT JOIN expenses e ON c.id = e.category_id 
-        WHERE c.user_id = ?
-        GROUP BY c.id, c.name
-        ORDER BY current_month DESC
-        """
-        
-        cursor = conn.execute(query, (current_month, prev_month, user_id))
-        data = []
-        
-        for row in cursor.fetchall():
-            current = float(row['current_month'])
-            prev = float(row['prev_month'])
-            change_percent = 0
-            if prev > 0:
-                change_percent = ((current - prev) / prev) * 100
-                
-            data.append({
-                'category': row['name'],
-                'current_month': current,
-                'prev_month': prev,
-                'change_percent': round(change_percent, 1)
-            })
-            
+        cursor = conn.execute(_SQL_COMPARE, (
+            bounds['start'], bounds['start'],
+            bounds['prev_start'], bounds['next_start'], user_id
+        ))
+        data = [
+            {'category': r[0], 'current_month': r[1], 'prev_month': r[2], 'change_percent': r[3]}
+            for r in cursor
+        ]
         conn.close()
         
-        return {
+        return json_response({
             "success": True, 
             "data": data,
             "period": {
                 "current": current_month,
                 "previous": prev_month
             }
-        }
+        })
         
     except Exception as e:
         app.logger.error(f"Error in expenses_compare: {e}")
-        return {"success": False, "error": str(e)}, 500
+        return json_response({"success": False, "error": str(e)}, 500)
 
 @app.route('/api/convert')
 @login_required
@@ -3931,18 +4041,25 @@ def api_convert():
 @login_required 
 def get_exchange_rates():
     """API для получения курсов валют."""
+    cached = _exr_rates_cache["rates"]
+    if cached is not None and time.monotonic() < _exr_rates_cache["expires"]:
+        return json_response({"ok": True, "rates": cached})
+
     try:
+        # Проверяем кэш курсов (обновляем раз в час); соединение закрываем сразу,
+        # чтобы не держать его во время сетевых запросов и при ошибках
         conn = get_db()
-        
-        # Проверяем кэш курсов (обновляем раз в час)
-        cursor = conn.execute("""
-        SELECT from_currency, to_currency, rate, updated_at 
-        FROM exchange_rates 
-        WHERE updated_at > datetime('now', '-1 hour')
-        """)
+        try:
+            rows = conn.execute("""
+            SELECT from_currency, to_currency, rate, updated_at 
+            FROM exchange_rates 
+            WHERE updated_at > datetime('now', '-1 hour')
+            """).fetchall()
+        finally:
+            conn.close()
         
         cached_rates = {}
-        for row in cursor.fetchall():
+        for row in rows:
             key = f"{row['from_currency']}_{row['to_currency']}"
             cached_rates[key] = float(row['rate'])
         
@@ -3957,23 +4074,34 @@ def get_exchange_rates():
                     if key not in cached_rates:
                         needed_pairs.append((from_curr, to_curr))
         
-        # Загружаем недостающие курсы
+        # Загружаем недостающие курсы параллельно (каждая пара — свой HTTP-запрос
+        # и своё соединение с БД); всё, что не успело за EXR_FETCH_BUDGET_SECONDS, пропускаем
         if needed_pairs:
-            for from_curr, to_curr in needed_pairs:
-                try:
-                    rate = get_exchange_rate(from_curr, to_curr)
-                    if rate and rate > 0:
-                        cached_rates[f"{from_curr}_{to_curr}"] = rate
-                except Exception as e:
-                    app.logger.warning(f"Failed to get rate {from_curr}->{to_curr}: {e}")
-        
-        conn.close()
-        
-        return {"ok": True, "rates": cached_rates}
+            pool = ThreadPoolExecutor(max_workers=min(8, len(needed_pairs)))
+            try:
+                futures = {pool.submit(get_exchange_rate, f, t): (f, t) for f, t in needed_pairs}
+                done, _ = wait(futures, timeout=EXR_FETCH_BUDGET_SECONDS)
+                for future in done:
+                    from_curr, to_curr = futures[future]
+                    try:
+                        rate = future.result()
+                        if rate and rate > 0:
+                            cached_rates[f"{from_curr}_{to_curr}"] = rate
+                    except Exception as e:
+                        app.logger.warning(f"Failed to get rate {from_curr}->{to_curr}: {e}")
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+        
+        # Кэшируем только полный набор, чтобы не залипнуть на час без части курсов
+        if len(cached_rates) == len(currencies) * (len(currencies) - 1):
+            _exr_rates_cache["rates"] = cached_rates
+            _exr_rates_cache["expires"] = time.monotonic() + EXR_RESPONSE_TTL_SECONDS
+        
+        return json_response({"ok": True, "rates": cached_rates})
         
     except Exception as e:
         app.logger.error(f"Error in get_exchange_rates: {e}")
-        return {"ok": False, "error": str(e)}, 500
+        return json_response({"ok": False, "error": str(e)}, 500)
 
 # -----------------------------------------------------------------------------
 # Savings Goals
@@ -4123,26 +4251,28 @@ def create_shared_budget():
         conn = get_db()
         user_id = session['user_id']
         
-        # Генерируем уникальный код приглашения
-        import secrets
-        invite_code = secrets.token_urlsafe(8)
-        
-        # Создаем shared budget
-        cursor = conn.execute("""
-        INSERT INTO shared_budgets (name, creator_id, invite_code)
-        VALUES (?, ?, ?)
-        """, (name, user_id, invite_code))
-        
-        shared_budget_id = cursor.lastrowid
-        
-        # Добавляем создателя как администратора
-        conn.execute("""
-        INSERT INTO shared_budget_members (shared_budget_id, user_id, role)
-        VALUES (?, ?, 'admin')
-        """, (shared_budget_id, user_id))
-        
-        conn.commit()
-        conn.close()
+        # Бюджет и создатель-администратор пишутся в одной транзакции;
+        # при коллизии UNIQUE invite_code пробуем новый код
+        try:
+            for attempt in range(3):
+                invite_code = secrets.token_urlsafe(8)
+                try:
+                    with conn:
+                        cursor = conn.execute("""
+                        INSERT INTO shared_budgets (name, creator_id, invite_code)
+                        VALUES (?, ?, ?)
+                        """, (name, user_id, invite_code))
+                        
+                        conn.execute("""
+                        INSERT INTO shared_budget_members (shared_budget_id, user_id, role)
+                        VALUES (?, ?, 'admin')
+                        """, (cursor.lastrowid, user_id))
+                    break
+                except sqlite3.IntegrityError:
+                    if attempt == 2:
+                        raise
+        finally:
+            conn.close()
         
         flash(f'Семейный бюджет "{name}" создан. Код для приглашения: {invite_code}', 'success')
         
@@ -4204,6 +4334,18 @@ def join_shared_budget():
         
     return redirect(url_for('shared_budgets'))
 
+_SQL_SHARED_DETAIL_EXPENSES = """
+SELECT e.amount, e.note AS description, e.date, c.name AS category_name, u.name AS username
+FROM expenses e
+JOIN categories c ON e.category_id = c.id
+JOIN users u ON e.user_id = u.id
+JOIN shared_budget_members sbm ON u.id = sbm.user_id
+WHERE sbm.shared_budget_id = ? 
+AND e.date >= ? AND e.date < ?
+ORDER BY e.date DESC, e.id DESC
+LIMIT 50
+"""
+
 @app.route('/shared-budgets/<int:budget_id>')
 @login_required
 def shared_budget_detail(budget_id):
@@ -4236,17 +4378,10 @@ def shared_budget_detail(budget_id):
     members = cursor.fetchall()
     
     # Получаем общие расходы всех участников за текущий месяц
-    cursor = conn.execute("""
-    SELECT e.amount, e.note AS description, e.date, c.name AS category_name, u.name AS username
-    FROM expenses e
-    JOIN categories c ON e.category_id = c.id
-    JOIN users u ON e.user_id = u.id
-    JOIN shared_budget_members sbm ON u.id = sbm.user_id
-    WHERE sbm.shared_budget_id = ? 
-    AND strftime('%Y-%m', e.date) = strftime('%Y-%m', 'now')
-    ORDER BY e.date DESC, e.id DESC
-    LIMIT 50
-    """, (budget_id,))
+    bounds = month_bounds()
+    cursor = conn.execute(
+        _SQL_SHARED_DETAIL_EXPENSES, (budget_id, bounds['start'], bounds['next_start'])
+    )
     
     recent_expenses = cursor.fetchall()
     
@@ -4256,30 +4391,35 @@ def shared_budget_detail(budget_id):
                          budget=budget, 
                          members=members, 
                          recent_expenses=recent_expenses)
+
+# CSP и HSTS зависят только от конфигурации — собираем строки один раз
+_CSP_HEADER = "; ".join([
+    "default-src 'self'",
+    "script-src 'self' 'unsafe-inline' https://telegram.org",
+    "style-src 'self' 'unsafe-inline'",
+    "font-src 'self' data: https://r2cdn.perplexity.ai",
+    "img-src 'self' data:",
+    "connect-src 'self' https://api.exchangerate.host",
+    "frame-src https://oauth.telegram.org"
+])
+
+# HSTS только если включён HTTPS (HTTPS_MODE)
+_HSTS_ENABLED = https_mode
+
 @app.after_request
 def set_security_headers(response):
+    # Статике нужны только заголовки кэширования
+    if request.endpoint == 'static':
+        response.headers['Cache-Control'] = 'public, max-age=86400'
+        return response
+
     response.headers['X-Content-Type-Options'] = 'nosniff'
     response.headers['X-Frame-Options'] = 'DENY'
     response.headers['X-XSS-Protection'] = '1; mode=block'
+    response.headers['Content-Security-Policy'] = _CSP_HEADER
 
-    csp_base = [
-        "default-src 'self'",
-        "script-src 'self' 'unsafe-inline' https://telegram.org",
-        "style-src 'self' 'unsafe-inline'",
-        "font-src 'self' data: https://r2cdn.perplexity.ai",
-        "img-src 'self' data:",
-        "connect-src 'self' https://api.exchangerate.host",
-        "frame-src https://oauth.telegram.org"
-    ]
-
-    response.headers['Content-Security-Policy'] = "; ".join(csp_base)
-
-    # HSTS только если у тебя включён HTTPS (можно завязать на переменную окружения)
-    if os.environ.get('HTTPS_MODE', 'false').lower() == 'true':
+    if _HSTS_ENABLED:
         response.headers['Strict-Transport-Security'] = 'max-age=31536000; includeSubDomains'
-
-    if request.endpoint == 'static':
-        response.headers['Cache-Control'] = 'public, max-age=86400'
     return response
 def add_profile_columns_if_missing():
     """Добавляем поля профиля в таблицу users если их нет."""
@@ -4322,12 +4462,15 @@ def ensure_new_tables():
     try:
         conn = get_db()
         
-        # Проверяем существование таблиц
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='savings_goals'")
-        if not cursor.fetchone():
+        # Проверяем существование таблиц одним запросом к sqlite_master
+        existing = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name IN "
+            "('savings_goals', 'shared_budgets', 'shared_budget_members', 'exchange_rates', 'budget_rollover')"
+        )}
+        if 'savings_goals' not in existing:
             # Таблица для целей накоплений
             conn.execute("""
-            CREATE TABLE savings_goals (
+            CREATE TABLE IF NOT EXISTS savings_goals (
               id INTEGER PRIMARY KEY AUTOINCREMENT,
               user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
               name TEXT NOT NULL,
@@ -4341,11 +4484,10 @@ def ensure_new_tables():
             """)
             app.logger.info("Created savings_goals table")
         
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='shared_budgets'")
-        if not cursor.fetchone():
+        if 'shared_budgets' not in existing:
             # Таблица для shared budgets
             conn.execute("""
-            CREATE TABLE shared_budgets (
+            CREATE TABLE IF NOT EXISTS shared_budgets (
               id INTEGER PRIMARY KEY AUTOINCREMENT,
               name TEXT NOT NULL,
               creator_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
@@ -4355,11 +4497,10 @@ def ensure_new_tables():
             """)
             app.logger.info("Created shared_budgets table")
         
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='shared_budget_members'")
-        if not cursor.fetchone():
+        if 'shared_budget_members' not in existing:
             # Участники shared budgets
             conn.execute("""
-            CREATE TABLE shared_budget_members (
+            CREATE TABLE IF NOT EXISTS shared_budget_members (
               id INTEGER PRIMARY KEY AUTOINCREMENT,
               shared_budget_id INTEGER NOT NULL REFERENCES shared_budgets(id) ON DELETE CASCADE,
               user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
@@ -4370,11 +4511,10 @@ def ensure_new_tables():
             """)
             app.logger.info("Created shared_budget_members table")
         
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='exchange_rates'")
-        if not cursor.fetchone():
+        if 'exchange_rates' not in existing:
             # Курсы валют (для кэширования)
             conn.execute("""
-            CREATE TABLE exchange_rates (
+            CREATE TABLE IF NOT EXISTS exchange_rates (
               id INTEGER PRIMARY KEY AUTOINCREMENT,
               from_currency TEXT NOT NULL,
               to_currency TEXT NOT NULL,
@@ -4385,11 +4525,10 @@ def ensure_new_tables():
             """)
             app.logger.info("Created exchange_rates table")
             
-        cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='budget_rollover'")
-        if not cursor.fetchone():
+        if 'budget_rollover' not in existing:
             # Таблица для хранения накопленных остатков по категориям
             conn.execute("""
-            CREATE TABLE budget_rollover (
+            CREATE TABLE IF NOT EXISTS budget_rollover (
               id INTEGER PRIMARY KEY AUTOINCREMENT,
               user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
               category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
@@ -1,83 +1,432 @@
-from flask import Flask, render_template
+from flask import Flask, render_template, current_app, redirect, url_for, flash, g, session, jsonify, request, abort, make_response
+from flask_login import current_user
+from sqlalchemy import select, text
 from app.core.extensions import db, migrate, login_manager, csrf, cache
+from app.core.caching import CacheManager
 from app.core.config import get_config
-from app.core.config import config_by_name
 from app.core.monitoring import monitor_modal_performance
 import os
+import time
+import hashlib
+import logging
+import queue
+import importlib
+from functools import wraps
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from pathlib import Path
 from typing import Optional
 
+# Project paths, resolved once at import
+_ROOT = Path(__file__).resolve().parent.parent
+TEMPLATE_DIR = str(_ROOT / 'templates')
+STATIC_DIR = str(_ROOT / 'static')
+LOGS_DIR = str(_ROOT / 'logs')  # development logs
+JINJA_CACHE_DIR = str(_ROOT / '.jinja_cache')  # development bytecode cache
+
+try:
+    _ROOT.joinpath('logs').mkdir(exist_ok=True)
+except OSError:
+    pass  # Read-only checkout; file logging falls back to console
+
+# One formatter shared by the main and error log handlers
+_LOG_FMT = logging.Formatter(
+    '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
+)
+
+class _BufferedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler writing through a 64 KiB buffer.
+
+    Records below WARNING stay in the buffer; the listener flushes it once the
+    queue goes idle, so small writes are coalesced into larger ones.
+    """
+
+    buffer_size = 65536
+
+    def __init__(self, *args, **kwargs):
+        self._defer_flush = False
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        return self._builtin_open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                                  encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record):
+        self._defer_flush = record.levelno < logging.WARNING
+        try:
+            super().emit(record)
+        finally:
+            self._defer_flush = False
+
+    def flush(self):
+        if not self._defer_flush:
+            super().flush()
+
+
+class _IdleFlushQueueListener(QueueListener):
+    """QueueListener that flushes its handlers when no record arrives for 250 ms."""
+
+    idle_flush_interval = 0.25
+
+    def dequeue(self, block):
+        if not block:
+            return self.queue.get(False)
+        try:
+            return self.queue.get(timeout=self.idle_flush_interval)
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get()
+
+
+# File logging shared by every create_app() call in the process:
+# (config_name, logs_dir) -> (QueueHandler, QueueListener)
+_HANDLER_CACHE = {}
+
+# Blueprints registered by the factory: (module, attribute, csrf_exempt)
+BLUEPRINTS = (
+    ('app.modules.auth', 'auth_bp', False),
+    ('app.modules.budget', 'budget_bp', False),
+    ('app.modules.goals', 'goals_bp', False),
+    ('app.modules.issues', 'issues_bp', False),
+    ('app.api.v1', 'api_v1_bp', True),
+)
+
+# Backward compatibility POST routes that only redirect to the new endpoints:
+# (rule, endpoint, target endpoint, ((target arg, view arg), ...))
+COMPAT_REDIRECTS = (
+    ('/update_profile', 'update_profile_compat', 'auth.profile', ()),
+    ('/account_password', 'account_password_compat', 'auth.change_password', ()),
+    ('/add_goal', 'add_goal_compat', 'goals.create_goal', ()),
+    ('/update_goal_progress/<int:goal_id>', 'update_goal_progress_compat', 'goals.add_progress', ()),
+    ('/categories/update/<int:cat_id>', 'categories_update_compat', 'budget.edit_category',
+     (('category_id', 'cat_id'),)),
+)
+
+# Legacy multi-source category actions that are not implemented yet: (rule, endpoint)
+COMPAT_FLASH = (
+    ('/update_source_percentage/<int:cat_id>', 'update_source_percentage_compat'),
+    ('/remove_source_from_category/<int:cat_id>/<int:source_id>', 'remove_source_from_category_compat'),
+    ('/add_source_to_category/<int:cat_id>', 'add_source_to_category_compat'),
+    ('/toggle_multi_source/<int:cat_id>', 'toggle_multi_source_compat'),
+)
+
+# Currency symbol mapping for templates
+CURRENCY_SYMBOLS = {
+    'RUB': '₽',
+    'USD': '$',
+    'EUR': '€',
+    'KZT': '₸',
+    'BYN': 'Br',
+    'AMD': '֏',
+    'GEL': '₾'
+}
+
+# Settings modals: (name, template, needs user, needs stats); endpoint is settings_<name>_modal
+SETTINGS_MODALS = (
+    ('profile', 'settings_profile.html', True, False),
+    ('password', 'settings_password.html', True, False),
+    ('interface', 'settings_interface.html', False, False),
+    ('export', 'settings_export.html', False, True),
+    ('import', 'settings_import.html', False, False),
+    ('clear-data', 'settings_clear_data.html', False, True),
+    ('delete-account', 'settings_delete_account.html', True, True),
+)
+
+
+def _make_compat_redirect(target, url_args=(), message=None):
+    """Build a view that redirects a legacy URL to its new endpoint.
+
+    Targets without view args always resolve to the same URL, so it is built
+    once on the first hit and reused afterwards.
+    """
+    resolved = []
+    # Renamed URLs are permanent; placeholders that flash a message must stay
+    # temporary, or browsers would keep skipping the feature once it ships
+    code = 302 if message else 301
+
+    def view(**kwargs):
+        if message:
+            flash(message, 'info')
+        if url_args:
+            return redirect(url_for(target, **{name: kwargs[arg] for name, arg in url_args}), code=code)
+        if not resolved:
+            resolved.append(url_for(target))
+        return redirect(resolved[0], code=code)
+    return view
+
+
+def _modal_template(name):
+    """Resolved Template for a modal, cached per app outside debug.
+
+    Passing the Template to render_template() skips the loader lookup while
+    still running the context processors.
+    """
+    if current_app.debug:
+        return name
+    templates = current_app.extensions.setdefault('_modal_templates', {})
+    template = templates.get(name)
+    if template is None:
+        template = templates[name] = current_app.jinja_env.get_template(name)
+    return template
+
+
+def _row_state(obj):
+    """Column values of a model instance, for modal ETags."""
+    return tuple(getattr(obj, column.key) for column in obj.__table__.columns)
+
+
+def _render_modal(name, *state, **context):
+    """Render a modal with an ETag and answer 304 when the client copy is current.
+
+    The tag covers the template file, the user and their currency, the CSRF
+    token (rolled every half WTF_CSRF_TIME_LIMIT so a cached form never
+    carries an expired token) and ``state``, the rows the modal displays.
+    """
+    template = _modal_template(name)
+    if current_app.debug:
+        return render_template(template, **context)
+
+    time_limit = current_app.config.get('WTF_CSRF_TIME_LIMIT', 3600)
+    parts = (
+        template.filename,
+        os.path.getmtime(template.filename),
+        current_user.get_id(),
+        getattr(current_user, 'default_currency', None),
+        session.get('currency'),
+        session.get(current_app.config.get('WTF_CSRF_FIELD_NAME', 'csrf_token')),
+        int(time.time() // (time_limit / 2)) if time_limit else 0,
+        state,
+    )
+    # Keyed so the tag reveals nothing about the hashed row values
+    secret = current_app.secret_key
+    key = (secret.encode() if isinstance(secret, str) else secret)[:64]
+    etag = hashlib.blake2b(repr(parts).encode(), digest_size=8, key=key).hexdigest()
+
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(render_template(template, **context))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def _require_owned_goal(view):
+    """Pass the current user's goal for ``goal_id`` to the view, or 404."""
+    @wraps(view)
+    def wrapper(goal_id, **kwargs):
+        if not current_user.is_authenticated:
+            return redirect(url_for('auth.login'))
+        from app.modules.goals.models import SavingsGoal
+        goal = db.session.execute(
+            select(SavingsGoal).where(SavingsGoal.id == goal_id,
+                                      SavingsGoal.user_id == current_user.id)
+        ).scalar_one_or_none()
+        if goal is None:
+            abort(404)
+        return view(goal, **kwargs)
+    return wrapper
+
+
+_SQL_USER_STATS = text("""
+    SELECT 'expenses_count', COUNT(*) FROM expenses WHERE user_id = :user_id
+    UNION ALL
+    SELECT 'income_count', COUNT(*) FROM income WHERE user_id = :user_id
+    UNION ALL
+    SELECT 'categories_count', COUNT(*) FROM categories WHERE user_id = :user_id
+    UNION ALL
+    SELECT 'goals_count', COUNT(*) FROM savings_goals WHERE user_id = :user_id
+""")
+_EMPTY_STATS = {'expenses_count': 0, 'income_count': 0, 'categories_count': 0, 'goals_count': 0}
+
+
+def _get_user_stats(user_id):
+    """Row counts shown in the export / clear-data / delete-account modals.
+
+    Memoized on ``g`` for the request and in the app cache under the user's
+    data version, which every budget or goal write moves.
+    """
+    if '_user_stats' in g:
+        return g._user_stats
+    try:
+        key = f'ustats:{user_id}:{CacheManager.get_data_version(user_id)}'
+        stats = cache.get(key)
+        if stats is None:
+            # One statement, four index-backed counts (see add_user_id_indexes)
+            rows = db.session.execute(_SQL_USER_STATS, {'user_id': user_id})
+            stats = dict(_EMPTY_STATS)
+            stats.update(rows.all())
+            cache.set(key, stats, timeout=300)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning('Could not load user stats: %s', e)
+        stats = dict(_EMPTY_STATS)
+    g._user_stats = stats
+    return stats
+
+
+def _make_settings_modal(template, with_user=False, with_stats=False):
+    """Build the view for one settings modal from its SETTINGS_MODALS entry."""
+    template = f'components/modals/{template}'
+
+    def view():
+        if not current_user.is_authenticated:
+            return redirect(url_for('auth.login'))
+        context = {}
+        state = []
+        if with_user:
+            from app.modules.auth.models import User
+            user = db.session.get(User, current_user.id)
+            if not user:
+                return redirect(url_for('auth.logout'))
+            context['user'] = user
+            state.append(_row_state(user))
+        if with_stats:
+            context['stats'] = _get_user_stats(current_user.id)
+            state.append(sorted(context['stats'].items()))
+        return _render_modal(template, *state, **context)
+    return view
+
+
+def _writable_dir(path):
+    """Create path if needed; return it only if this process can write there."""
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return None
+    return path if os.access(path, os.W_OK | os.X_OK) else None
+
+
+def _load_migration_heads(app):
+    """Read Alembic head revisions once; the script directory is fixed at runtime."""
+    from alembic.script import ScriptDirectory
+    with app.app_context():
+        try:
+            script = ScriptDirectory.from_config(migrate.get_config())
+            return tuple(sorted(script.get_heads()))
+        except Exception as e:
+            app.logger.warning('Could not read migration heads: %s', e)
+            return None
+
+
+def _check_migrations():
+    """Compare the database revision with the cached heads.
+
+    The result is remembered in ``_MIGRATIONS_UP_TO_DATE`` for /healthz.
+    """
+    from alembic.runtime.migration import MigrationContext
+    head_revs = current_app.config.get('_MIGRATION_HEAD')
+    ok = False
+    if head_revs is not None:
+        with db.engine.connect() as connection:
+            current_revs = MigrationContext.configure(connection).get_current_heads()
+        ok = tuple(sorted(current_revs)) == head_revs
+    current_app.config['_MIGRATIONS_UP_TO_DATE'] = ok
+    return ok
+
 
 def create_app(config_name: Optional[str] = None):
     """Application factory pattern."""
-    import os
-    import logging
-    from logging.handlers import RotatingFileHandler
+    import atexit
     
     if config_name is None:
         config_name = os.getenv("APP_CONFIG", "production")
     
-    # Set template and static folders relative to project root
-    template_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'templates'))
-    static_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'static'))
-
     # Use LOG_DIR env var or fallback to /var/lib/crystalbudget/logs for production
     # This ensures logs work with systemd ProtectSystem=strict
     logs_dir = os.getenv('LOG_DIR', '/var/lib/crystalbudget/logs')
+    # Compiled templates go to the same writable state directory, never the
+    # checkout, which may be read-only or owned by whoever deployed it
+    jinja_cache_dir = os.getenv('JINJA_CACHE_DIR', '/var/lib/crystalbudget/jinja_cache')
     if config_name == 'development':
-        logs_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logs'))
+        logs_dir = LOGS_DIR
+        jinja_cache_dir = JINJA_CACHE_DIR
     
-    app = Flask(__name__, template_folder=template_dir, static_folder=static_dir)
+    # Template and static folders live in the project root
+    app = Flask(__name__, template_folder=TEMPLATE_DIR, static_folder=STATIC_DIR)
     
     # Load configuration
-    app.config.from_object(config_by_name[config_name])
+    app.config.from_object(get_config(config_name))
+    
+    # Serialize JSON responses with orjson
+    from app.core.json_provider import init_json_provider
+    init_json_provider(app)
     
     # Setup logging to files
     if not app.debug and not app.testing:
         try:
-            # Create logs directory if it doesn't exist
-            if not os.path.exists(logs_dir):
-                os.makedirs(logs_dir)
-
-            # Main application log
-            file_handler = RotatingFileHandler(
-                os.path.join(logs_dir, 'crystalbudget.log'),
-                maxBytes=10240000,  # 10MB
-                backupCount=10
-            )
-            file_handler.setFormatter(logging.Formatter(
-                '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-            ))
-            file_handler.setLevel(logging.INFO)
-            app.logger.addHandler(file_handler)
-
-            # Error log
-            error_handler = RotatingFileHandler(
-                os.path.join(logs_dir, 'errors.log'),
-                maxBytes=10240000,
-                backupCount=5
-            )
-            error_handler.setFormatter(logging.Formatter(
-                '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
-            ))
-            error_handler.setLevel(logging.ERROR)
-            app.logger.addHandler(error_handler)
+            key = (config_name, logs_dir)
+            cached = _HANDLER_CACHE.get(key)
+            if cached is None:
+                # Development logs directory is created at import time
+                if logs_dir != LOGS_DIR:
+                    Path(logs_dir).mkdir(parents=True, exist_ok=True)
 
-            # Set log level from config
-            log_level = app.config.get('LOG_LEVEL', 'INFO')
-            app.logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
+                # Main application log
+                file_handler = _BufferedRotatingFileHandler(
+                    os.path.join(logs_dir, 'crystalbudget.log'),
+                    maxBytes=10240000,  # 10MB
+                    backupCount=10
+                )
+                file_handler.setFormatter(_LOG_FMT)
+                file_handler.setLevel(logging.INFO)
+
+                # Error log
+                error_handler = _BufferedRotatingFileHandler(
+                    os.path.join(logs_dir, 'errors.log'),
+                    maxBytes=10240000,
+                    backupCount=5
+                )
+                error_handler.setFormatter(_LOG_FMT)
+                error_handler.setLevel(logging.ERROR)
+
+                # File writes and rotation happen on a background listener thread;
+                # request threads only put records on the queue
+                log_queue = queue.SimpleQueue()
+                listener = _IdleFlushQueueListener(log_queue, file_handler, error_handler,
+                                                   respect_handler_level=True)
+                listener.start()
+                atexit.register(listener.stop)
+                cached = _HANDLER_CACHE[key] = (QueueHandler(log_queue), listener)
+
+            queue_handler, listener = cached
+            app.extensions['_log_listener'] = listener
+            # Same handler object every time, so repeated factories don't duplicate lines
+            app.logger.addHandler(queue_handler)
 
-            app.logger.info(f'CrystalBudget startup - Config: {config_name}')
+            # Set log level from config; the queue handler gets it too so
+            # filtered records are dropped before they are formatted and queued
+            log_level = logging.getLevelNamesMapping().get(
+                str(app.config.get('LOG_LEVEL', 'INFO')).upper(), logging.INFO
+            )
+            app.logger.setLevel(log_level)
+            queue_handler.setLevel(log_level)
+
+            app.logger.info('CrystalBudget startup - Config: %s', config_name)
         except (PermissionError, OSError) as e:
             # File logging disabled due to read-only filesystem (systemd ProtectSystem=strict)
             # Fall back to console logging only
-            app.logger.warning(f'File logging disabled due to filesystem restrictions: {e}')
+            app.logger.warning('File logging disabled due to filesystem restrictions: %s', e)
             app.logger.setLevel(logging.INFO)
     
     # For self-checking (temporary)
-    app.logger.warning(
-        f"Config={config_name} TESTING={app.config.get('TESTING')} "
-        f"CSRF={app.config.get('WTF_CSRF_ENABLED')}"
-    )
+    if app.logger.isEnabledFor(logging.DEBUG):
+        app.logger.debug(
+            'Config=%s TESTING=%s CSRF=%s',
+            config_name, app.config.get('TESTING'), app.config.get('WTF_CSRF_ENABLED')
+        )
+    
+    # Keep every compiled template in memory (the default LRU holds 400)
+    if not app.debug:
+        app.jinja_options = {**app.jinja_options, 'cache_size': 1000}
+    
+    # Compiled templates survive worker restarts; an unwritable directory
+    # would make every render fail, so fall back to in-memory compilation
+    if not app.testing:
+        jinja_cache_dir = _writable_dir(jinja_cache_dir)
+        if jinja_cache_dir:
+            from jinja2 import FileSystemBytecodeCache
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(jinja_cache_dir)
     
     # Initialize extensions
     db.init_app(app)
@@ -93,23 +442,33 @@ def create_app(config_name: Optional[str] = None):
     csrf.init_app(app)
     cache.init_app(app)
     
+    # Migration heads only change on deploy, so read them once per process
+    app.config['_MIGRATION_HEAD'] = _load_migration_heads(app)
+    
     # Configure login manager (skip for testing)
     if not app.config.get('LOGIN_DISABLED', False):
         login_manager.login_view = 'auth.login'
         login_manager.login_message = 'Пожалуйста, войдите в систему'
         login_manager.login_message_category = 'info'
     
+    # Shared by the user loaders and the settings modals below
+    from app.modules.auth.models import User
+    
     @login_manager.user_loader
     def load_user(user_id):
-        from app.modules.auth.models import User
-        return User.query.get(int(user_id))
+        return db.session.get(User, int(user_id))
     
     # Test mode user loader override
     if app.config.get('TESTING', False):
         @login_manager.request_loader
         def load_user_from_request(request):
             """Auto-authenticate in testing mode."""
-            from app.modules.auth.models import User
+            # Fast path: test user id cached after the first lookup
+            test_user_id = app.config.get('_TEST_USER_ID')
+            if test_user_id is not None:
+                test_user = db.session.get(User, test_user_id)
+                if test_user is not None:
+                    return test_user
             # Return a mock test user (create if doesn't exist)
             test_user = User.query.filter_by(telegram_id=12345).first()
             if not test_user:
@@ -124,298 +483,60 @@ def create_app(config_name: Optional[str] = None):
                     db.session.commit()
                 except:
                     db.session.rollback()
+            if test_user.id is not None:
+                app.config['_TEST_USER_ID'] = test_user.id
             return test_user
     
     # Register blueprints
-    from app.modules.auth import auth_bp
-    from app.modules.budget import budget_bp
-    from app.modules.goals import goals_bp
-    from app.modules.issues import issues_bp
-    from app.api.v1 import api_v1_bp
-    
-    # Exempt API from CSRF protection
-    csrf.exempt(api_v1_bp)
-    
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(budget_bp)
-    app.register_blueprint(goals_bp)
-    app.register_blueprint(issues_bp)
-    app.register_blueprint(api_v1_bp)
+    for module_name, attr, csrf_exempt in BLUEPRINTS:
+        blueprint = getattr(importlib.import_module(module_name), attr)
+        if csrf_exempt:
+            # Exempt API from CSRF protection
+            csrf.exempt(blueprint)
+        app.register_blueprint(blueprint)
     
     # Backward compatibility routes
-    from flask import redirect, url_for
-    
     @app.route('/set-theme', methods=['POST'])
     def set_theme_compat():
         """Backward compatibility redirect for set-theme endpoint."""
         from app.modules.auth.routes import set_theme
         return set_theme()
     
-    # More backward compatibility routes
-    @app.route('/update_profile', methods=['POST'])
-    def update_profile_compat():
-        """Backward compatibility redirect for update profile."""
-        return redirect(url_for('auth.profile'))
-    
-    @app.route('/account_password', methods=['POST'])
-    def account_password_compat():
-        """Backward compatibility redirect for password change."""
-        return redirect(url_for('auth.change_password'))
-    
-    @app.route('/add_goal', methods=['POST'])
-    def add_goal_compat():
-        """Backward compatibility redirect for add goal."""
-        return redirect(url_for('goals.create_goal'))
-    
-    @app.route('/update_goal_progress/<int:goal_id>', methods=['POST'])
-    def update_goal_progress_compat(goal_id):
-        """Backward compatibility redirect for goal progress."""
-        return redirect(url_for('goals.add_progress'))
+    # More backward compatibility routes (ENABLE_COMPAT_ROUTES=false drops them)
+    if app.config.get('ENABLE_COMPAT_ROUTES', True):
+        for rule, endpoint, target, url_args in COMPAT_REDIRECTS:
+            app.add_url_rule(rule, endpoint, _make_compat_redirect(target, url_args), methods=['POST'])
+        for rule, endpoint in COMPAT_FLASH:
+            app.add_url_rule(rule, endpoint,
+                             _make_compat_redirect('budget.categories', message='Функция в разработке'),
+                             methods=['POST'])
     
     # Modal routes for goals
     @app.route('/modals/goal/add')
     @monitor_modal_performance('goal_add')
     def goal_add_modal():
         """Return goal add modal content."""
-        from flask_login import login_required, current_user
-        from flask import session
         if not current_user.is_authenticated:
             return redirect(url_for('auth.login'))
-        return render_template('components/modals/goal_add.html', 
-                             currency_symbol='₽')
+        return _render_modal('components/modals/goal_add.html', goal=None, currency_symbol='₽')
 
     @app.route('/modals/goal/<int:goal_id>/edit')
     @monitor_modal_performance('goal_edit')
-    def goal_edit_modal(goal_id):
+    @_require_owned_goal
+    def goal_edit_modal(goal):
         """Return goal edit modal content."""
-        from flask_login import login_required, current_user
-        from flask import session
-        if not current_user.is_authenticated:
-            return redirect(url_for('auth.login'))
-        
-        user_id = current_user.id
-        from app.modules.goals.models import SavingsGoal
-        goal = SavingsGoal.query.filter_by(id=goal_id, user_id=user_id).first_or_404()
-        
-        return render_template('components/modals/goal_edit.html', 
-                             goal=goal,
-                             currency_symbol='₽')
+        return _render_modal('components/modals/goal_edit.html', _row_state(goal), goal=goal, currency_symbol='₽')
 
     @app.route('/modals/goal/<int:goal_id>/topup')
-    def goal_topup_modal(goal_id):
+    @_require_owned_goal
+    def goal_topup_modal(goal):
         """Return goal topup modal content."""
-        from flask_login import login_required, current_user
-        from flask import session
-        if not current_user.is_authenticated:
-            return redirect(url_for('auth.login'))
-        
-        user_id = current_user.id
-        from app.modules.goals.models import SavingsGoal
-        goal = SavingsGoal.query.filter_by(id=goal_id, user_id=user_id).first_or_404()
-        
-        return render_template('components/modals/goal_topup.html', 
-                             goal=goal,
-                             currency_symbol='₽')
+        return _render_modal('components/modals/goal_topup.html', _row_state(goal), goal=goal, currency_symbol='₽')
     
     # Modal routes for settings
-    @app.route('/modals/settings/profile')
-    def settings_profile_modal():
-        """Return profile settings modal content."""
-        from flask_login import current_user
-        from flask import session
-        if not current_user.is_authenticated:
-            return redirect(url_for('auth.login'))
-        
-        from app.modules.auth.models import User
-        user = User.query.get(current_user.id)
-        if not user:
-            return redirect(url_for('auth.logout'))
-        
-        return render_template('components/modals/settings_profile.html', 
-                             user=user)
-
-    @app.route('/modals/settings/password')
-    def settings_password_modal():
-        """Return password change modal content."""
-        from flask_login import current_user
-        from flask import session
-        if not current_user.is_authenticated:
-            return redirect(url_for('auth.login'))
-        
-        from app.modules.auth.models import User
-        user = User.query.get(current_user.id)
-        if not user:
-            return redirect(url_for('auth.logout'))
-        
-        return render_template('components/modals/settings_password.html', 
-                             user=user)
-
-    @app.route('/modals/settings/interface')
-    def settings_interface_modal():
-        """Return interface settings modal content."""
-        from flask_login import current_user
-        if not current_user.is_authenticated:
-            return redirect(url_for('auth.login'))
-        
-        return render_template('components/modals/settings_interface.html')
-
-    @app.route('/modals/settings/export')
-    def settings_export_modal():
-        """Return data export modal content."""
-        from flask_login import current_user
-        from flask import session
-        if not current_user.is_authenticated:
-            return redirect(url_for('auth.login'))
-        
-        # Get user statistics
-        user_id = current_user.id
-        from app.core.extensions import db
-        from sqlalchemy import text
-        
-        stats = {}
-        try:
-            # Get counts for user data
-            result = db.session.execute(text("""
-                SELECT 
-                    (SELECT COUNT(*) FROM expenses WHERE user_id = :user_id) as expenses_count,
-                    (SELECT COUNT(*) FROM income WHERE user_id = :user_id) as income_count,
-                    (SELECT COUNT(*) FROM categories WHERE user_id = :user_id) as categories_count,
-                    (SELECT COUNT(*) FROM savings_goals WHERE user_id = :user_id) as goals_count
-            """), {'user_id': user_id}).fetchone()
-            
-            if result:
-                stats = {
-                    'expenses_count': result.expenses_count,
-                    'income_count': result.income_count, 
-                    'categories_count': result.categories_count,
-                    'goals_count': result.goals_count
-                }
-        except Exception:
-            stats = {'expenses_count': 0, 'income_count': 0, 'categories_count': 0, 'goals_count': 0}
-        
-        return render_template('components/modals/settings_export.html', 
-                             stats=stats)
-
-    @app.route('/modals/settings/import')
-    def settings_import_modal():
-        """Return data import modal content."""
-        from flask_login import current_user
-        if not current_user.is_authenticated:
-            return redirect(url_for('auth.login'))
-        
-        return render_template('components/modals/settings_import.html')
-
-    @app.route('/modals/settings/clear-data')
-    def settings_clear_data_modal():
-        """Return clear data modal content."""
-        from flask_login import current_user
-        from flask import session
-        if not current_user.is_authenticated:
-            return redirect(url_for('auth.login'))
-        
-        # Get user statistics
-        user_id = current_user.id
-        from app.core.extensions import db
-        from sqlalchemy import text
-        
-        stats = {}
-        try:
-            result = db.session.execute(text("""
-                SELECT 
-                    (SELECT COUNT(*) FROM expenses WHERE user_id = :user_id) as expenses_count,
-                    (SELECT COUNT(*) FROM income WHERE user_id = :user_id) as income_count,
-                    (SELECT COUNT(*) FROM categories WHERE user_id = :user_id) as categories_count,
-                    (SELECT COUNT(*) FROM savings_goals WHERE user_id = :user_id) as goals_count
-            """), {'user_id': user_id}).fetchone()
-            
-            if result:
-                stats = {
-                    'expenses_count': result.expenses_count,
-                    'income_count': result.income_count,
-                    'categories_count': result.categories_count,
-                    'goals_count': result.goals_count
-                }
-        except Exception:
-            stats = {'expenses_count': 0, 'income_count': 0, 'categories_count': 0, 'goals_count': 0}
-        
-        return render_template('components/modals/settings_clear_data.html', 
-                             stats=stats)
-
-    @app.route('/modals/settings/delete-account')
-    def settings_delete_account_modal():
-        """Return delete account modal content."""
-        from flask_login import current_user
-        from flask import session
-        if not current_user.is_authenticated:
-            return redirect(url_for('auth.login'))
-        
-        from app.modules.auth.models import User
-        user = User.query.get(current_user.id)
-        if not user:
-            return redirect(url_for('auth.logout'))
-        
-        # Get user statistics
-        user_id = current_user.id
-        from app.core.extensions import db
-        from sqlalchemy import text
-        
-        stats = {}
-        try:
-            result = db.session.execute(text("""
-                SELECT 
-                    (SELECT COUNT(*) FROM expenses WHERE user_id = :user_id) as expenses_count,
-                    (SELECT COUNT(*) FROM income WHERE user_id = :user_id) as income_count,
-                    (SELECT COUNT(*) FROM categories WHERE user_id = :user_id) as categories_count,
-                    (SELECT COUNT(*) FROM savings_goals WHERE user_id = :user_id) as goals_count
-            """), {'user_id': user_id}).fetchone()
-            
-            if result:
-                stats = {
-                    'expenses_count': result.expenses_count,
-                    'income_count': result.income_count,
-                    'categories_count': result.categories_count,
-                    'goals_count': result.goals_count
-                }
-        except Exception:
-            stats = {'expenses_count': 0, 'income_count': 0, 'categories_count': 0, 'goals_count': 0}
-        
-        return render_template('components/modals/settings_delete_account.html', 
-                             user=user,
-                             stats=stats)
-    
-    @app.route('/categories/update/<int:cat_id>', methods=['POST'])
-    def categories_update_compat(cat_id):
-        """Backward compatibility redirect for category update."""
-        return redirect(url_for('budget.edit_category', category_id=cat_id))
-    
-    @app.route('/update_source_percentage/<int:cat_id>', methods=['POST'])
-    def update_source_percentage_compat(cat_id):
-        """Backward compatibility for source percentage update."""
-        flash('Функция в разработке', 'info')
-        return redirect(url_for('budget.categories'))
-    
-    @app.route('/remove_source_from_category/<int:cat_id>/<int:source_id>', methods=['POST'])
-    def remove_source_from_category_compat(cat_id, source_id):
-        """Backward compatibility for removing source from category."""
-        flash('Функция в разработке', 'info')
-        return redirect(url_for('budget.categories'))
-    
-    @app.route('/add_source_to_category/<int:cat_id>', methods=['POST'])
-    def add_source_to_category_compat(cat_id):
-        """Backward compatibility for adding source to category."""
-        flash('Функция в разработке', 'info')
-        return redirect(url_for('budget.categories'))
-    
-    @app.route('/toggle_multi_source/<int:cat_id>', methods=['POST'])
-    def toggle_multi_source_compat(cat_id):
-        """Backward compatibility for toggling multi-source mode."""
-        flash('Функция в разработке', 'info')
-        return redirect(url_for('budget.categories'))
-    
-    @app.route('/favicon.ico')
-    def favicon():
-        """Serve favicon from static folder."""
-        return redirect(url_for('static', filename='favicon.ico'))
+    for name, template, with_user, with_stats in SETTINGS_MODALS:
+        app.add_url_rule(f'/modals/settings/{name}', f"settings_{name.replace('-', '_')}_modal",
+                         _make_settings_modal(template, with_user, with_stats))
     
     @app.route('/modal-test')
     def modal_test():
@@ -432,17 +553,14 @@ def create_app(config_name: Optional[str] = None):
         """Health check endpoint for monitoring."""
         try:
             # Проверяем подключение к БД
-            from app.core.extensions import db
-            from sqlalchemy import text
             with db.engine.connect() as connection:
                 connection.execute(text('SELECT 1'))
             
-            # Проверяем что миграции актуальны
-            from flask_migrate import current, heads
-            current_rev = current()
-            head_rev = heads()
-            
-            if current_rev != head_rev:
+            # Состояние миграций проверяется один раз (и заново в /healthz/deep)
+            migrations_ok = app.config.get('_MIGRATIONS_UP_TO_DATE')
+            if migrations_ok is None:
+                migrations_ok = _check_migrations()
+            if not migrations_ok:
                 return {'status': 'error', 'message': 'Database migrations not up to date'}, 500
                 
             return {'status': 'ok', 'message': 'Application healthy'}, 200
@@ -450,10 +568,19 @@ def create_app(config_name: Optional[str] = None):
         except Exception as e:
             return {'status': 'error', 'message': str(e)}, 500
     
+    @app.route('/healthz/deep')
+    def health_check_deep():
+        """Full health check: re-reads the database revision on every call."""
+        try:
+            if not _check_migrations():
+                return {'status': 'error', 'message': 'Database migrations not up to date'}, 500
+            return {'status': 'ok', 'message': 'Application healthy'}, 200
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}, 500
+    
     @app.route('/monitoring/modal-system')
     def monitoring_dashboard():
         """Modal system monitoring dashboard."""
-        from flask_login import current_user
         from app.core.monitoring import create_monitoring_dashboard_data, log_bundle_usage
         
         # Only accessible to authenticated users
@@ -470,8 +597,6 @@ def create_app(config_name: Optional[str] = None):
     @app.route('/monitoring/modal-system/api')
     def monitoring_api():
         """JSON API for modal system monitoring."""
-        from flask_login import current_user
-        from flask import jsonify
         from app.core.monitoring import create_monitoring_dashboard_data
         
         # Only accessible to authenticated users  
@@ -483,8 +608,6 @@ def create_app(config_name: Optional[str] = None):
     @app.route('/api/telemetry/modal', methods=['POST'])
     def modal_telemetry_api():
         """API endpoint for modal telemetry collection."""
-        from flask_login import current_user
-        from flask import jsonify, request
         from app.core.telemetry import ModalTelemetry
         
         # Only for authenticated users
@@ -492,7 +615,7 @@ def create_app(config_name: Optional[str] = None):
             return jsonify({'error': 'Authentication required'}), 401
         
         try:
-            data = request.get_json()
+            data = request.get_json(cache=False)
             if not data or 'event_type' not in data or 'modal_name' not in data:
                 return jsonify({'error': 'Missing required fields'}), 400
             
@@ -510,7 +633,7 @@ def create_app(config_name: Optional[str] = None):
     
     # Import models for Alembic
     from app.modules.auth.models import User
-    from app.modules.budget.models import Category, Expense, Income, CategoryRule, ExchangeRate, IncomeSource  
+    from app.modules.budget.models import Category, Expense, Income, CategoryRule, ExchangeRate, IncomeSource, UserDataVersion
     from app.modules.goals.models import SavingsGoal, SharedBudget, SharedBudgetMember
     from app.modules.issues.models import Issue, IssueComment
     
@@ -522,9 +645,15 @@ def create_app(config_name: Optional[str] = None):
     from app.core.events import register_default_handlers
     register_default_handlers()
     
-    # Register CLI commands
-    from app.core.cli import register_cli_commands
-    register_cli_commands(app)
+    # Invalidate budget cache on commits that bypass BudgetService
+    from app.core.caching import register_cache_invalidation
+    register_cache_invalidation()
+    
+    # Register CLI commands (only under the flask CLI; importing them creates
+    # the screenshots directory and pulls in the whole service layer)
+    if os.environ.get('FLASK_RUN_FROM_CLI'):
+        from app.core.cli import register_cli_commands
+        register_cli_commands(app)
     
     # Register template filters
     from app.core.filters import register_filters
@@ -537,11 +666,15 @@ def create_app(config_name: Optional[str] = None):
     
     @app.context_processor
     def inject_feature_flags():
-        # Log bundle usage for monitoring
-        try:
-            log_bundle_usage()
-        except Exception:
-            pass  # Don't break page rendering for monitoring failures
+        # Log bundle usage for monitoring, once per request however many
+        # templates it renders; the config helpers are callables, so the
+        # templates evaluate them only where they are used
+        if '_bundle_logged' not in g:
+            g._bundle_logged = True
+            try:
+                log_bundle_usage()
+            except Exception:
+                pass  # Don't break page rendering for monitoring failures
 
         return {
             'modal_system_config': modal_system_config,
@@ -551,8 +684,9 @@ def create_app(config_name: Optional[str] = None):
     @app.context_processor
     def inject_user_currency():
         """Inject user currency into template context."""
-        from flask import session
-        from flask_login import current_user
+        # Later renders in the same request reuse the first lookup
+        if '_user_currency' in g:
+            return g._user_currency
 
         # Get currency from session or user object
         currency = session.get('currency', 'RUB')
@@ -565,21 +699,11 @@ def create_app(config_name: Optional[str] = None):
             except:
                 pass
 
-        # Currency symbol mapping
-        currency_symbols = {
-            'RUB': '₽',
-            'USD': '$',
-            'EUR': '€',
-            'KZT': '₸',
-            'BYN': 'Br',
-            'AMD': '֏',
-            'GEL': '₾'
-        }
-
-        return {
+        g._user_currency = {
             'user_currency': currency,
-            'currency_symbol': currency_symbols.get(currency, currency)
+            'currency_symbol': CURRENCY_SYMBOLS.get(currency, currency)
         }
+        return g._user_currency
     
     # Initialize asset helpers
     from app.core.assets import init_asset_helpers
@@ -589,5 +713,23 @@ def create_app(config_name: Optional[str] = None):
     from app.core.diagnostics import init_diagnostics
     init_diagnostics(app)
     
+    # Compile every template up front (filters and globals are registered
+    # by now) so the first request to each page doesn't pay for it
+    if app.jinja_env.bytecode_cache and not app.debug:
+        for name in app.jinja_env.list_templates():
+            try:
+                app.jinja_env.get_template(name)
+            except Exception as e:
+                app.logger.warning('Template %s failed to compile: %s', name, e)
+    
+    # Browsers probe /favicon.ico on every navigation; serve it straight
+    # from WSGI so it never enters the Flask request pipeline.
+    from werkzeug.middleware.shared_data import SharedDataMiddleware
+    app.wsgi_app = SharedDataMiddleware(
+        app.wsgi_app,
+        {'/favicon.ico': os.path.join(STATIC_DIR, 'favicon.ico')},
+        cache_timeout=31536000,  # one year
+    )
+    
     return app
 
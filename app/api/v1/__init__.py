@@ -1,6 +1,40 @@
-from flask import Blueprint
+from functools import wraps
+from flask import Blueprint, g, current_app
+from flask_login import current_user
+from werkzeug.exceptions import HTTPException
+from .schemas import APIResponse
 
 api_v1_bp = Blueprint('api_v1', __name__, url_prefix='/api/v1')
 
+
+@api_v1_bp.before_request
+def _resolve_user_id():
+    """Resolve the caller's user id once; handlers read g.user_id."""
+    g.user_id = current_user.id if current_user.is_authenticated else None
+
+
+def api_errors(message, validation=False):
+    """Turn unexpected handler errors into a logged 500 API error response.
+
+    With validation=True a ValueError (raised by the request validators) is
+    answered with 400 and its own message instead. HTTP exceptions pass
+    through to Flask untouched.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            try:
+                return f(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                if validation and isinstance(e, ValueError):
+                    return APIResponse.error(str(e)), 400
+                current_app.logger.exception(message)
+                return APIResponse.error(message), 500
+        return decorated_function
+    return decorator
+
+
 # Import API endpoints to register them
 from . import budget, goals
\ No newline at end of file
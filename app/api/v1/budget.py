@@ -1,332 +1,403 @@
 """Budget API endpoints."""
-from flask import request, session, current_app
+import hashlib
+from datetime import date
+from functools import wraps
+from flask import request, make_response, g
 from flask_login import login_required
-from app.core.time import YearMonth, parse_year_month
+from app.core.caching import CacheManager
+from app.core.extensions import cache, db
+from app.core.money import get_user_currency
+from app.core.time import YearMonth
 from app.modules.budget.service import BudgetService
-from app.modules.budget.models import Expense, Category, Income
-from .schemas import APIResponse, ExpenseSchema, CategorySchema, IncomeSchema, BudgetSnapshotSchema, RequestValidator
-from . import api_v1_bp
+from app.modules.budget.models import IncomeSource
+from .schemas import APIResponse, MoneySchema, ExpenseSchema, ExpenseCursor, CategorySchema, IncomeSchema, BudgetSnapshotSchema, RequestValidator
+from . import api_v1_bp, api_errors
+
+# Page size bounds for expense listings
+MAX_PAGE_LIMIT = 200
+
+
+def _page_limit():
+    """?limit= clamped to 1..MAX_PAGE_LIMIT (default 50)."""
+    limit = request.args.get('limit', 50, type=int)
+    return min(max(limit, 1), MAX_PAGE_LIMIT)
+
+
+def _year_month_arg():
+    """?ym= as a YearMonth (current month when absent) and an error response or None."""
+    ym_param = request.args.get('ym')
+    if not ym_param:
+        return YearMonth.current(), None
+    year_month, error = RequestValidator.validate_year_month(ym_param)
+    if error:
+        return None, (APIResponse.error(f"Invalid year-month: {error}"), 400)
+    return year_month, None
+
+
+def _expenses_page(user_id, year_month, limit, offset=0, cursor=None, category_id=None, with_total=False):
+    """Serialized expenses page and its pagination block.
+
+    Filtering and pagination happen in SQL; one extra row tells if another
+    page exists without a COUNT(*).
+    """
+    expenses, total_count = BudgetService.get_expenses_page(
+        user_id, year_month, category_id=category_id, limit=limit + 1, offset=offset,
+        cursor=cursor, with_total=with_total
+    )
+    has_more = len(expenses) > limit
+    expenses = expenses[:limit]
+    
+    pagination = {
+        'limit': limit,
+        'offset': offset,
+        'has_more': has_more,
+        'next_cursor': ExpenseCursor.encode(expenses[-1]) if has_more else None
+    }
+    if with_total:
+        pagination['total'] = total_count
+    
+    return ExpenseSchema.serialize_rows(expenses), pagination
+
+
+def conditional_get(f):
+    """Answer repeat GETs with 304 while the user's budget data is unchanged.
+
+    The weak ETag covers the user, the full query string, the current month
+    (the default for ?ym=), the display currency and the user's data version,
+    so it is known before any query or serialization runs.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        user_id = g.user_id
+        # Kept on g so _summary_data doesn't read it again
+        version = g.data_version = CacheManager.get_data_version(user_id)
+        raw = f"{user_id}|{request.full_path}|{YearMonth.current()}|{get_user_currency()}|{version}"
+        etag = hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+        
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return decorated_function
 
 
 @api_v1_bp.route('/budget/summary')
 @login_required
+@conditional_get
+@api_errors("Failed to get budget summary")
 def budget_summary():
     """Get budget summary for month."""
-    user_id = current_user.id
+    user_id = g.user_id
     
     # Get year-month parameter
-    ym_param = request.args.get('ym')
-    if ym_param:
-        year_month, error = RequestValidator.validate_year_month(ym_param)
-        if error:
-            return APIResponse.error(f"Invalid year-month: {error}"), 400
-    else:
-        year_month = YearMonth.current()
+    year_month, error = _year_month_arg()
+    if error:
+        return error
     
-    try:
+    return APIResponse.success(_summary_data(user_id, year_month))
+
+
+def _summary_data(user_id, year_month):
+    """Serialized month snapshot, reused until the user's data version or currency changes."""
+    version = g.get('data_version') or CacheManager.get_data_version(user_id)
+    cache_key = f"snap:{user_id}:{year_month}:{get_user_currency()}:{version}"
+    data = cache.get(cache_key)
+    if data is None:
         snapshot = BudgetService.calculate_month_snapshot(user_id, year_month)
         data = BudgetSnapshotSchema.serialize(snapshot)
-        return APIResponse.success(data)
-    except Exception as e:
-        current_app.logger.error(f"Error getting budget summary: {e}")
-        return APIResponse.error("Failed to get budget summary"), 500
+        cache.set(cache_key, data, timeout=300)
+    return data
 
 
 @api_v1_bp.route('/expenses')
 @login_required
+@conditional_get
+@api_errors("Failed to get expenses")
 def get_expenses():
     """Get expenses for user."""
-    user_id = current_user.id
+    user_id = g.user_id
     
     # Get filters
-    ym_param = request.args.get('ym')
     category_id = request.args.get('category_id', type=int)
-    limit = request.args.get('limit', 50, type=int)
+    limit = _page_limit()
     offset = request.args.get('offset', 0, type=int)
+    cursor_param = request.args.get('cursor')
+    with_total = request.args.get('with_total') == '1'
     
     # Validate year-month
-    if ym_param:
-        year_month, error = RequestValidator.validate_year_month(ym_param)
+    year_month, error = _year_month_arg()
+    if error:
+        return error
+    
+    if offset < 0:
+        return APIResponse.error("Invalid offset: must not be negative"), 400
+    
+    # Keyset cursor takes precedence over legacy offset paging
+    cursor = None
+    if cursor_param:
+        cursor, error = RequestValidator.validate_cursor(cursor_param)
         if error:
-            return APIResponse.error(f"Invalid year-month: {error}"), 400
-    else:
-        year_month = YearMonth.current()
+            return APIResponse.error(f"Invalid cursor: {error}"), 400
+        offset = 0
     
-    try:
-        # Get expenses for month
-        expenses = BudgetService.get_expenses_for_month(user_id, year_month)
-        
-        # Filter by category if specified
-        if category_id:
-            expenses = [exp for exp in expenses if exp.category_id == category_id]
-        
-        # Apply pagination
-        total_count = len(expenses)
-        expenses = expenses[offset:offset + limit]
-        
-        data = {
-            'expenses': ExpenseSchema.serialize_list(expenses),
-            'pagination': {
-                'total': total_count,
-                'limit': limit,
-                'offset': offset,
-                'has_more': offset + limit < total_count
-            },
-            'filters': {
-                'year_month': str(year_month),
-                'category_id': category_id
-            }
+    expenses, pagination = _expenses_page(
+        user_id, year_month, limit, offset=offset, cursor=cursor,
+        category_id=category_id, with_total=with_total
+    )
+    
+    data = {
+        'expenses': expenses,
+        'pagination': pagination,
+        'filters': {
+            'year_month': str(year_month),
+            'category_id': category_id
         }
-        
-        return APIResponse.success(data)
-    except Exception as e:
-        current_app.logger.error(f"Error getting expenses: {e}")
-        return APIResponse.error("Failed to get expenses"), 500
+    }
+    
+    return APIResponse.success(data)
 
 
 @api_v1_bp.route('/expenses', methods=['POST'])
 @login_required
+@api_errors("Failed to create expense", validation=True)
 def create_expense():
     """Create new expense."""
-    user_id = current_user.id
+    user_id = g.user_id
     
-    try:
-        data = request.get_json()
-        if not data:
-            return APIResponse.error("No data provided"), 400
-        
-        # Validate data
-        validated_data = RequestValidator.validate_expense_create(data)
-        
-        # Create expense
-        expense = BudgetService.add_expense(
-            user_id=user_id,
-            category_id=validated_data['category_id'],
-            amount=validated_data['amount'],
-            description=validated_data.get('description'),
-            date_val=validated_data['date'],
-            currency=validated_data['currency']
-        )
-        
-        return APIResponse.success(
-            ExpenseSchema.serialize(expense),
-            "Expense created successfully"
-        ), 201
-        
-    except ValueError as e:
-        return APIResponse.error(str(e)), 400
-    except Exception as e:
-        current_app.logger.error(f"Error creating expense: {e}")
-        return APIResponse.error("Failed to create expense"), 500
+    data = request.get_json(silent=True, cache=False)
+    if not data:
+        return APIResponse.error("No data provided"), 400
+    
+    # Validate data
+    validated_data = RequestValidator.validate_expense_create(data)
+    
+    # Create expense
+    expense = BudgetService.add_expense(
+        user_id=user_id,
+        category_id=validated_data['category_id'],
+        amount=validated_data['amount'],
+        description=validated_data.get('description'),
+        date_val=validated_data['date'],
+        currency=validated_data['currency']
+    )
+    
+    return APIResponse.success(
+        ExpenseSchema.serialize(expense),
+        "Expense created successfully"
+    ), 201
 
 
 @api_v1_bp.route('/expenses/<int:expense_id>', methods=['PUT'])
 @login_required
+@api_errors("Failed to update expense", validation=True)
 def update_expense(expense_id):
     """Update expense."""
-    user_id = current_user.id
+    user_id = g.user_id
     
-    try:
-        data = request.get_json()
-        if not data:
-            return APIResponse.error("No data provided"), 400
-        
-        # Validate data
-        validated_data = RequestValidator.validate_expense_create(data)
-        
-        # Update expense
-        expense = BudgetService.update_expense(
-            expense_id=expense_id,
-            user_id=user_id,
-            **validated_data
-        )
-        
-        if not expense:
-            return APIResponse.error("Expense not found"), 404
-        
-        return APIResponse.success(
-            ExpenseSchema.serialize(expense),
-            "Expense updated successfully"
-        )
-        
-    except ValueError as e:
-        return APIResponse.error(str(e)), 400
-    except Exception as e:
-        current_app.logger.error(f"Error updating expense: {e}")
-        return APIResponse.error("Failed to update expense"), 500
+    data = request.get_json(silent=True, cache=False)
+    if not data:
+        return APIResponse.error("No data provided"), 400
+    
+    # Validate only the fields sent; the service writes just the changed ones
+    validated_data = RequestValidator.validate_expense_update(data)
+    
+    # Update expense
+    expense = BudgetService.update_expense(
+        expense_id=expense_id,
+        user_id=user_id,
+        **validated_data
+    )
+    
+    if not expense:
+        return APIResponse.error("Expense not found"), 404
+    
+    return APIResponse.success(
+        ExpenseSchema.serialize(expense),
+        "Expense updated successfully"
+    )
 
 
 @api_v1_bp.route('/expenses/<int:expense_id>', methods=['DELETE'])
 @login_required
+@api_errors("Failed to delete expense")
 def delete_expense(expense_id):
     """Delete expense."""
-    user_id = current_user.id
+    user_id = g.user_id
     
-    try:
-        success = BudgetService.delete_expense(expense_id, user_id)
-        
-        if not success:
-            return APIResponse.error("Expense not found"), 404
-        
-        return APIResponse.success(message="Expense deleted successfully")
-        
-    except Exception as e:
-        current_app.logger.error(f"Error deleting expense: {e}")
-        return APIResponse.error("Failed to delete expense"), 500
+    success = BudgetService.delete_expense(expense_id, user_id)
+    
+    if not success:
+        return APIResponse.error("Expense not found"), 404
+    
+    return APIResponse.success(message="Expense deleted successfully")
 
 
 @api_v1_bp.route('/categories')
 @login_required
+@conditional_get
+@api_errors("Failed to get categories")
 def get_categories():
     """Get categories for user."""
-    user_id = current_user.id
+    user_id = g.user_id
     
-    try:
-        categories = BudgetService.get_user_categories(user_id)
-        data = CategorySchema.serialize_list(categories)
-        return APIResponse.success(data)
-    except Exception as e:
-        current_app.logger.error(f"Error getting categories: {e}")
-        return APIResponse.error("Failed to get categories"), 500
+    categories = BudgetService.get_user_categories(user_id)
+    data = CategorySchema.serialize_list(categories)
+    return APIResponse.success(data)
 
 
 @api_v1_bp.route('/categories', methods=['POST'])
 @login_required
+@api_errors("Failed to create category", validation=True)
 def create_category():
     """Create new category."""
-    user_id = current_user.id
+    user_id = g.user_id
     
-    try:
-        data = request.get_json()
-        if not data:
-            return APIResponse.error("No data provided"), 400
-        
-        # Validate data
-        validated_data = RequestValidator.validate_category_create(data)
-        
-        # Create category
-        category = BudgetService.create_category(
-            user_id=user_id,
-            name=validated_data['name'],
-            limit_type=validated_data['limit_type'],
-            value=validated_data['value']
-        )
-        
-        return APIResponse.success(
-            CategorySchema.serialize(category),
-            "Category created successfully"
-        ), 201
-        
-    except ValueError as e:
-        return APIResponse.error(str(e)), 400
-    except Exception as e:
-        current_app.logger.error(f"Error creating category: {e}")
-        return APIResponse.error("Failed to create category"), 500
+    data = request.get_json(silent=True, cache=False)
+    if not data:
+        return APIResponse.error("No data provided"), 400
+    
+    # Validate data
+    validated_data = RequestValidator.validate_category_create(data)
+    
+    # Create category
+    category = BudgetService.create_category(
+        user_id=user_id,
+        name=validated_data['name'],
+        limit_type=validated_data['limit_type'],
+        value=validated_data['value']
+    )
+    
+    return APIResponse.success(
+        CategorySchema.serialize(category),
+        "Category created successfully"
+    ), 201
 
 
 @api_v1_bp.route('/income')
 @login_required
+@conditional_get
+@api_errors("Failed to get income")
 def get_income():
     """Get income for user."""
-    user_id = current_user.id
+    user_id = g.user_id
     
     # Get year-month parameter
-    ym_param = request.args.get('ym')
-    if ym_param:
-        year_month, error = RequestValidator.validate_year_month(ym_param)
-        if error:
-            return APIResponse.error(f"Invalid year-month: {error}"), 400
-    else:
-        year_month = YearMonth.current()
+    year_month, error = _year_month_arg()
+    if error:
+        return error
     
-    try:
-        income_list = BudgetService.get_income_for_month(user_id, year_month)
-        total_income = BudgetService.get_total_income_for_month(user_id, year_month)
-        
-        data = {
-            'income': IncomeSchema.serialize_list(income_list),
-            'total': {
-                'amount': float(total_income.amount),
-                'currency': total_income.currency,
-                'formatted': total_income.format()
-            },
-            'year_month': str(year_month)
-        }
-        
-        return APIResponse.success(data)
-    except Exception as e:
-        current_app.logger.error(f"Error getting income: {e}")
-        return APIResponse.error("Failed to get income"), 500
+    return APIResponse.success(_income_data(user_id, year_month))
+
+
+def _income_data(user_id, year_month):
+    """Serialized month income list with its total."""
+    income_list = BudgetService.get_income_for_month(user_id, year_month)
+    total_income = BudgetService.get_total_income_for_month(user_id, year_month, incomes=income_list)
+    
+    return {
+        'income': IncomeSchema.serialize_list(income_list),
+        'total': MoneySchema.serialize(total_income),
+        'year_month': str(year_month)
+    }
+
+
+@api_v1_bp.route('/budget/dashboard')
+@login_required
+@conditional_get
+@api_errors("Failed to get dashboard")
+def get_dashboard():
+    """Get summary, first expenses page and income for month in one response.
+
+    Replaces the separate summary/expenses/income fetches a dashboard makes;
+    all three read through the same request session and connection.
+    """
+    user_id = g.user_id
+    limit = _page_limit()
+    
+    # Get year-month parameter
+    year_month, error = _year_month_arg()
+    if error:
+        return error
+    
+    expenses, pagination = _expenses_page(user_id, year_month, limit)
+    
+    data = {
+        'year_month': str(year_month),
+        'summary': _summary_data(user_id, year_month),
+        'expenses': {
+            'expenses': expenses,
+            'pagination': pagination
+        },
+        'income': _income_data(user_id, year_month)
+    }
+    
+    return APIResponse.success(data)
 
 
 @api_v1_bp.route('/income', methods=['POST'])
 @login_required
+@api_errors("Failed to save income", validation=True)
 def create_income():
     """Create or update income."""
-    user_id = current_user.id
+    user_id = g.user_id
     
-    try:
-        data = request.get_json()
-        if not data:
-            return APIResponse.error("No data provided"), 400
-        
-        # Validate data
-        validated_data = RequestValidator.validate_income_create(data)
-        
-        # Create/update income - use date if available, fallback to year/month
-        if 'date' in validated_data:
-            income = BudgetService.add_income(
-                user_id=user_id,
-                source_name=validated_data['source_name'],
-                amount=validated_data['amount'],
-                date=validated_data['date'],
-                currency=validated_data['currency']
-            )
-        else:
-            # Legacy year/month support
-            from datetime import date
-            income_date = date(validated_data['year'], validated_data['month'], 1)
-            income = BudgetService.add_income(
-                user_id=user_id,
-                source_name=validated_data['source_name'],
-                amount=validated_data['amount'],
-                date=income_date,
-                currency=validated_data['currency']
-            )
-        
-        return APIResponse.success(
-            IncomeSchema.serialize(income),
-            "Income saved successfully"
-        ), 201
-        
-    except ValueError as e:
-        return APIResponse.error(str(e)), 400
-    except Exception as e:
-        current_app.logger.error(f"Error saving income: {e}")
-        return APIResponse.error("Failed to save income"), 500
+    data = request.get_json(silent=True, cache=False)
+    if not data:
+        return APIResponse.error("No data provided"), 400
+    
+    # Validate data
+    validated_data = RequestValidator.validate_income_create(data)
+    
+    # Create/update income - use date if available, fallback to year/month
+    if 'date' in validated_data:
+        income = BudgetService.add_income(
+            user_id=user_id,
+            source_name=validated_data['source_name'],
+            amount=validated_data['amount'],
+            date=validated_data['date'],
+            currency=validated_data['currency']
+        )
+    else:
+        # Legacy year/month support
+        income_date = date(validated_data['year'], validated_data['month'], 1)
+        income = BudgetService.add_income(
+            user_id=user_id,
+            source_name=validated_data['source_name'],
+            amount=validated_data['amount'],
+            date=income_date,
+            currency=validated_data['currency']
+        )
+    
+    return APIResponse.success(
+        IncomeSchema.serialize(income),
+        "Income saved successfully"
+    ), 201
 
 
 @api_v1_bp.route('/income-sources')
 @login_required
+@conditional_get
+@api_errors("Failed to get income sources")
 def get_income_sources():
     """Get income sources for current user."""
-    from app.modules.budget.models import IncomeSource
-    from app.core.extensions import db
-
-    user_id = current_user.id
-
-    try:
-        sources = db.session.query(IncomeSource).filter_by(user_id=user_id).all()
-
-        return APIResponse.success({
-            'sources': [
-                {
-                    'id': str(source.id),
-                    'name': source.name
-                }
-                for source in sources
-            ]
-        })
-    except Exception as e:
-        current_app.logger.error(f"Error getting income sources: {e}")
-        return APIResponse.error("Failed to get income sources"), 500
\ No newline at end of file
+    user_id = g.user_id
+
+    # Only two columns are returned, so skip ORM instance construction
+    rows = db.session.query(IncomeSource.id, IncomeSource.name).filter(
+        IncomeSource.user_id == user_id
+    ).all()
+
+    return APIResponse.success({
+        'sources': [
+            {
+                'id': str(source_id),
+                'name': name
+            }
+            for source_id, name in rows
+        ]
+    })
\ No newline at end of file
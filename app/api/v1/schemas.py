@@ -1,5 +1,9 @@
 """API v1 schemas for request/response validation."""
+import base64
+import binascii
+import re
 from datetime import datetime, date
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from decimal import Decimal
 
@@ -43,6 +47,19 @@ class APIResponse:
         return response
 
 
+class MoneySchema:
+    """Money serialization schema."""
+    
+    @staticmethod
+    def serialize(money) -> Dict:
+        """Serialize Money value to dict."""
+        return {
+            'amount': float(money.amount),
+            'currency': money.currency,
+            'formatted': money.format()
+        }
+
+
 class ExpenseSchema:
     """Expense serialization schema."""
     
@@ -63,7 +80,25 @@ class ExpenseSchema:
     @staticmethod
     def serialize_list(expenses: List) -> List[Dict]:
         """Serialize list of expenses."""
-        return [ExpenseSchema.serialize(expense) for expense in expenses]
+        serialize = ExpenseSchema.serialize
+        return [serialize(expense) for expense in expenses]
+    
+    @staticmethod
+    def serialize_rows(rows: List) -> List[Dict]:
+        """Serialize Core rows from BudgetService.get_expenses_page."""
+        return [
+            {
+                'id': row.id,
+                'category_id': row.category_id,
+                'category_name': row.category_name,
+                'amount': float(row.amount),
+                'currency': row.currency,
+                'description': row.description,
+                'date': row.date.isoformat(),
+                'created_at': row.created_at.isoformat()
+            }
+            for row in rows
+        ]
 
 
 class CategorySchema:
@@ -84,7 +119,8 @@ class CategorySchema:
     @staticmethod
     def serialize_list(categories: List) -> List[Dict]:
         """Serialize list of categories."""
-        return [CategorySchema.serialize(category) for category in categories]
+        serialize = CategorySchema.serialize
+        return [serialize(category) for category in categories]
 
 
 class IncomeSchema:
@@ -107,7 +143,8 @@ class IncomeSchema:
     @staticmethod
     def serialize_list(incomes: List) -> List[Dict]:
         """Serialize list of incomes."""
-        return [IncomeSchema.serialize(income) for income in incomes]
+        serialize = IncomeSchema.serialize
+        return [serialize(income) for income in incomes]
 
 
 class GoalSchema:
@@ -133,7 +170,8 @@ class GoalSchema:
     @staticmethod
     def serialize_list(goals: List) -> List[Dict]:
         """Serialize list of goals."""
-        return [GoalSchema.serialize(goal) for goal in goals]
+        serialize = GoalSchema.serialize
+        return [serialize(goal) for goal in goals]
 
 
 class BudgetSnapshotSchema:
@@ -142,43 +180,20 @@ class BudgetSnapshotSchema:
     @staticmethod
     def serialize(snapshot: Dict) -> Dict:
         """Serialize budget snapshot."""
+        money = MoneySchema.serialize
         return {
             'year_month': str(snapshot['year_month']),
-            'total_income': {
-                'amount': float(snapshot['total_income'].amount),
-                'currency': snapshot['total_income'].currency,
-                'formatted': snapshot['total_income'].format()
-            },
-            'total_spent': {
-                'amount': float(snapshot['total_spent'].amount),
-                'currency': snapshot['total_spent'].currency,
-                'formatted': snapshot['total_spent'].format()
-            },
-            'total_remaining': {
-                'amount': float(snapshot['total_remaining'].amount),
-                'currency': snapshot['total_remaining'].currency,
-                'formatted': snapshot['total_remaining'].format()
-            },
+            'total_income': money(snapshot['total_income']),
+            'total_spent': money(snapshot['total_spent']),
+            'total_remaining': money(snapshot['total_remaining']),
             'categories': [
                 {
                     'category': CategorySchema.serialize(cat_summary['category']),
-                    'spent': {
-                        'amount': float(cat_summary['spent'].amount),
-                        'currency': cat_summary['spent'].currency,
-                        'formatted': cat_summary['spent'].format()
-                    },
-                    'limit': {
-                        'amount': float(cat_summary['limit'].amount),
-                        'currency': cat_summary['limit'].currency,
-                        'formatted': cat_summary['limit'].format()
-                    },
-                    'remaining': {
-                        'amount': float(cat_summary['remaining'].amount),
-                        'currency': cat_summary['remaining'].currency,
-                        'formatted': cat_summary['remaining'].format()
-                    },
+                    'spent': money(cat_summary['spent']),
+                    'limit': money(cat_summary['limit']),
+                    'remaining': money(cat_summary['remaining']),
                     'percentage_used': float(cat_summary['percentage_used']),
-                    'expenses_count': len(cat_summary['expenses'])
+                    'expenses_count': cat_summary['expenses_count']
                 }
                 for cat_summary in snapshot['categories']
             ]
@@ -206,6 +221,40 @@ class UserSchema:
 
 
 # Request validation helpers
+# Invitation codes are 8 characters from A-Z0-9 (see SharedBudgetService)
+_INVITATION_CODE_RE = re.compile(r'[A-Z0-9]{8}')
+
+
+@lru_cache(maxsize=512)
+def _parse_ym_cached(ym_string: str) -> tuple:
+    # YearMonth is an immutable tuple, so parsed results are safe to share
+    from app.core.time import parse_year_month
+    try:
+        return parse_year_month(ym_string), None
+    except ValueError as e:
+        return None, str(e)
+
+
+class ExpenseCursor:
+    """Opaque keyset cursor over (date, id) for expense listings."""
+    
+    @staticmethod
+    def encode(expense) -> str:
+        """Encode the position just after given expense."""
+        raw = f"{expense.date.isoformat()}|{expense.id}".encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+    
+    @staticmethod
+    def decode(token: str) -> tuple:
+        """Decode cursor into (date, id); raises ValueError if malformed."""
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+            date_part, id_part = raw.split('|')
+            return date.fromisoformat(date_part), int(id_part)
+        except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+            raise ValueError(f"malformed cursor: {token!r}") from e
+
+
 class RequestValidator:
     """Request data validation."""
     
@@ -215,6 +264,12 @@ class RequestValidator:
         from app.modules.budget.schemas import ExpenseData
         return ExpenseData.validate(data)
     
+    @staticmethod
+    def validate_expense_update(data: Dict) -> Dict:
+        """Validate partial expense update data."""
+        from app.modules.budget.schemas import ExpenseData
+        return ExpenseData.validate_partial(data)
+    
     @staticmethod
     def validate_category_create(data: Dict) -> Dict:
         """Validate category creation data."""
@@ -236,9 +291,25 @@ class RequestValidator:
     @staticmethod
     def validate_year_month(ym_string: str) -> tuple:
         """Validate and parse year-month string."""
-        from app.core.time import parse_year_month
+        if not ym_string:
+            # Empty means the current month, which must not be memoized
+            from app.core.time import YearMonth
+            return YearMonth.current(), None
+        return _parse_ym_cached(ym_string)
+    
+    @staticmethod
+    def validate_invitation_code(value) -> Optional[str]:
+        """Normalize invitation code; None if it cannot be a valid code."""
+        code = str(value).strip()
+        if len(code) != 8:
+            return None
+        code = code.upper()
+        return code if _INVITATION_CODE_RE.fullmatch(code) else None
+    
+    @staticmethod
+    def validate_cursor(cursor: str) -> tuple:
+        """Validate and decode expense pagination cursor."""
         try:
-            year_month = parse_year_month(ym_string)
-            return year_month, None
+            return ExpenseCursor.decode(cursor), None
         except ValueError as e:
-            return None, str(e)
\ No newline at end of file
+            return None, str(e)
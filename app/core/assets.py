@@ -20,7 +20,7 @@ class AssetManager:
             full_path = os.path.join(current_app.static_folder, filepath)
             
             if not os.path.exists(full_path):
-                current_app.logger.warning(f"Static file not found: {filepath}")
+                current_app.logger.warning("Static file not found: %s", filepath)
                 return "missing"
             
             # Get file modification time
@@ -41,7 +41,7 @@ class AssetManager:
             return file_hash
             
         except Exception as e:
-            current_app.logger.error(f"Error generating hash for {filepath}: {e}")
+            current_app.logger.error("Error generating hash for %s: %s", filepath, e)
             # Fallback to timestamp
             return str(int(datetime.now().timestamp()))[-8:]
     
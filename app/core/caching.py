@@ -1,8 +1,11 @@
 """Caching utilities."""
+import time
 from functools import wraps
+from itertools import chain
 from flask import request
 from flask_login import current_user
-from app.core.extensions import cache
+from sqlalchemy import event, inspect, or_, select, text
+from app.core.extensions import cache, db
 from app.core.time import YearMonth
 
 
@@ -75,13 +78,95 @@ def invalidate_user_cache(user_id, year_month=None):
     cache.clear()  # For now, clear entire cache
 
 
+# Versions start from the clock, so a user whose row is recreated (or a
+# restored database) never hands out a version an old ETag already used
+_BUMP_DATA_VERSIONS = text(
+    "INSERT INTO user_data_versions (user_id, version) VALUES (:user_id, :version) "
+    "ON CONFLICT (user_id) DO UPDATE SET version = CASE "
+    "WHEN user_data_versions.version >= excluded.version THEN user_data_versions.version + 1 "
+    "ELSE excluded.version END"
+)
+
+
+def _household_user_ids(connection, user_ids, budget_ids=()):
+    """Expand user_ids to everyone whose budget reads include their data.
+
+    Budget reads are family-wide, so a write by one member must move the
+    version of every user sharing a budget with them, whether linked through
+    users.shared_budget_id or shared_budget_members.
+    """
+    from app.modules.auth.models import User
+    from app.modules.goals.models import SharedBudgetMember
+    
+    user_ids = set(user_ids)
+    budget_ids = set(budget_ids)
+    if user_ids:
+        budget_ids.update(connection.execute(
+            select(User.shared_budget_id).where(
+                User.id.in_(user_ids), User.shared_budget_id.is_not(None))
+        ).scalars())
+        budget_ids.update(connection.execute(
+            select(SharedBudgetMember.budget_id).where(SharedBudgetMember.user_id.in_(user_ids))
+        ).scalars())
+    
+    # Selecting from users also drops ids deleted in this transaction
+    return set(connection.execute(
+        select(User.id).where(or_(
+            User.id.in_(user_ids),
+            User.shared_budget_id.in_(budget_ids),
+            User.id.in_(select(SharedBudgetMember.user_id)
+                        .where(SharedBudgetMember.budget_id.in_(budget_ids))),
+        ))
+    ).scalars())
+
+
+def _bump_data_versions(connection, user_ids):
+    """Move the data version of user_ids inside connection's transaction."""
+    if not user_ids:
+        return
+    version = time.time_ns()
+    connection.execute(_BUMP_DATA_VERSIONS, [
+        {'user_id': user_id, 'version': version} for user_id in user_ids
+    ])
+
+
 class CacheManager:
     """Centralized cache management."""
     
     @staticmethod
     def invalidate_budget_cache(user_id, year_month=None):
-        """Invalidate budget-related cache for user."""
-        invalidate_user_cache(user_id, year_month)
+        """Invalidate budget-related cache for user and their household.
+
+        Cached entries are keyed by data version, so moving the version is
+        enough. ORM writes already moved it at flush; this covers bulk and
+        raw SQL writes the flush hook cannot see.
+        """
+        if user_id in db.session.info.get('_last_bumped', ()):
+            return
+        CacheManager.bump_data_version(user_id)
+    
+    @staticmethod
+    def get_data_version(user_id):
+        """Get token that changes whenever user's budget data is mutated.
+
+        Read from user_data_versions, so it is the same in every worker.
+        """
+        from app.modules.budget.models import UserDataVersion
+        version = db.session.execute(
+            select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+        ).scalar()
+        return format(version or 0, 'x')
+    
+    @staticmethod
+    def bump_data_version(user_id):
+        """Mark household budget data as changed; call after committing the write.
+
+        Runs in its own short transaction so the caller's session is left alone.
+        """
+        with db.engine.begin() as connection:
+            user_ids = _household_user_ids(connection, [user_id])
+            _bump_data_versions(connection, user_ids)
+        db.session.info.setdefault('_last_bumped', set()).update(user_ids)
     
     @staticmethod
     def invalidate_goals_cache(user_id):
@@ -103,4 +188,78 @@ class CacheManager:
     def get_month_snapshot(user_id, year_month):
         """Get cached month snapshot."""
         key = CacheManager.get_month_snapshot_key(user_id, year_month)
-        return cache.get(key)
\ No newline at end of file
+        return cache.get(key)
+
+
+# Tables whose rows feed budget API responses or the settings stats; any
+# write to them moves the data version (and so cache keys and ETags) of the
+# writer's household
+BUDGET_TABLES = frozenset({
+    'categories', 'expenses', 'income', 'income_sources', 'category_rules',
+    'category_income_sources', 'exchange_rates', 'shared_budget_members',
+    'savings_goals',
+})
+
+_cache_invalidation_registered = False
+
+
+def _note_budget_writes(session, flush_context, instances):
+    users = session.info.setdefault('_budget_writes', set())
+    budgets = session.info.setdefault('_budget_households', set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, '__tablename__', None)
+        if table in BUDGET_TABLES:
+            users.add(getattr(obj, 'user_id', None))
+            if table == 'shared_budget_members':
+                budgets.add(obj.budget_id)
+        elif table == 'users':
+            # Joining or leaving a family changes what both households see
+            history = inspect(obj).attrs.shared_budget_id.history
+            if history.has_changes():
+                users.add(obj.id)
+                budgets.update(history.added)
+                budgets.update(history.deleted)
+        elif table == 'shared_budgets' and obj in session.deleted:
+            # Members are unlinked by the database, so resolve them while they still exist
+            users.update(_household_user_ids(session.connection(), (), [obj.id]))
+
+
+def _bump_flushed_writes(session, flush_context):
+    # Same transaction as the writes: the versions commit or roll back with them
+    users = session.info.pop('_budget_writes', set())
+    budgets = session.info.pop('_budget_households', set())
+    users.discard(None)
+    budgets.discard(None)
+    if users or budgets:
+        connection = session.connection()
+        user_ids = _household_user_ids(connection, users, budgets)
+        _bump_data_versions(connection, user_ids)
+        session.info.setdefault('_bumped_users', set()).update(user_ids)
+
+
+def _remember_committed_bumps(session):
+    # Lets explicit invalidate_budget_cache() calls after this commit skip
+    # users whose versions already moved with it
+    session.info['_last_bumped'] = session.info.pop('_bumped_users', set())
+
+
+def _discard_budget_writes(session):
+    for key in ('_budget_writes', '_budget_households', '_bumped_users', '_last_bumped'):
+        session.info.pop(key, None)
+
+
+def register_cache_invalidation():
+    """Move data versions on every flush that writes budget tables.
+
+    Many routes commit directly instead of going through BudgetService, so
+    this catches writes that never call CacheManager themselves.
+    """
+    global _cache_invalidation_registered
+    if _cache_invalidation_registered:
+        return
+    _cache_invalidation_registered = True
+    
+    event.listen(db.session, 'before_flush', _note_budget_writes)
+    event.listen(db.session, 'after_flush', _bump_flushed_writes)
+    event.listen(db.session, 'after_commit', _remember_committed_bumps)
+    event.listen(db.session, 'after_rollback', _discard_budget_writes)
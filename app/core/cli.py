@@ -167,7 +167,7 @@ def user_stats(user_id):
     click.echo(f"  Current month income: {snapshot['total_income'].format()}")
     click.echo(f"  Current month spent: {snapshot['total_spent'].format()}")
     click.echo(f"  Current month remaining: {snapshot['total_remaining'].format()}")
-    click.echo(f"  Expenses this month: {len(snapshot['expenses'])}")
+    click.echo(f"  Expenses this month: {sum(c['expenses_count'] for c in snapshot['categories'])}")
 
 
 @user_cli.command()
@@ -11,7 +11,7 @@ class BaseConfig:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_timeout': 20,
-        'pool_recycle': -1,
+        'pool_recycle': 3600,
         'pool_pre_ping': True
     }
 
@@ -42,6 +42,9 @@ class BaseConfig:
     # Feature Flags
     # Modal System Configuration (Stage 6: Simplified to kill-switch only)
     MODAL_SYSTEM_ENABLED = os.environ.get('MODAL_SYSTEM_ENABLED', 'true').lower() == 'true'
+    
+    # Legacy POST URLs from the monolith, redirected to the blueprint routes
+    ENABLE_COMPAT_ROUTES = os.environ.get('ENABLE_COMPAT_ROUTES', 'true').lower() == 'true'
 
 
 class DevelopmentConfig(BaseConfig):
@@ -86,10 +89,7 @@ def get_config(config_name=None):
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'development')
     
-    config_map = {
-        'development': DevelopmentConfig,
-        'production': ProductionConfig,
-        'testing': TestingConfig
-    }
-    
-    return config_map.get(config_name, DevelopmentConfig)
\ No newline at end of file
+    try:
+        return config_by_name[config_name]
+    except KeyError:
+        raise ValueError(f"Unknown config {config_name!r}") from None
\ No newline at end of file
@@ -135,7 +135,7 @@ class StaticAssetLogger:
             'referer': referer
         }
         
-        self.logger.warning(f"Static asset 404: {json.dumps(details)}")
+        self.logger.warning("Static asset 404: %s", json.dumps(details))
     
     def get_top_missing_assets(self, limit: int = 20) -> List[tuple]:
         """Get most frequently requested missing assets."""
@@ -213,7 +213,7 @@ def track_errors(f):
             }
             
             error_metrics.record_error(endpoint, 500, error_details)
-            current_app.logger.error(f"Unhandled exception in {endpoint}: {e}")
+            current_app.logger.error("Unhandled exception in %s: %s", endpoint, e)
             raise
     
     return decorated_function
@@ -233,7 +233,7 @@ def init_diagnostics(app):
             duration = (datetime.now() - g.start_time).total_seconds()
             if duration > 1.0:  # Log slow requests
                 current_app.logger.warning(
-                    f"Slow request: {request.endpoint} took {duration:.2f}s"
+                    "Slow request: %s took %.2fs", request.endpoint, duration
                 )
         return response
     
@@ -16,7 +16,7 @@ def register_error_handlers(app):
     
     @app.errorhandler(500)
     def internal_error(error):
-        logger.error(f'Server Error: {error}')
+        logger.error('Server Error: %s', error)
         if request.path.startswith('/api/'):
             return jsonify({'error': 'Internal server error'}), 500
         return render_template('errors/500.html'), 500
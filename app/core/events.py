@@ -174,24 +174,24 @@ class EventBus:
         if event_type not in self._handlers:
             self._handlers[event_type] = []
         self._handlers[event_type].append(handler)
-        logger.info(f"Subscribed handler {handler.__name__} to event {event_type}")
+        logger.info("Subscribed handler %s to event %s", handler.__name__, event_type)
     
     def publish(self, event: DomainEvent) -> None:
         """Publish event to all subscribed handlers."""
         event_type = event.event_type
         
         if event_type not in self._handlers:
-            logger.debug(f"No handlers for event {event_type}")
+            logger.debug("No handlers for event %s", event_type)
             return
         
-        logger.info(f"Publishing event {event_type} (ID: {event.event_id})")
+        logger.info("Publishing event %s (ID: %s)", event_type, event.event_id)
         
         for handler in self._handlers[event_type]:
             try:
                 handler(event)
-                logger.debug(f"Handler {handler.__name__} processed event {event_type}")
+                logger.debug("Handler %s processed event %s", handler.__name__, event_type)
             except Exception as e:
-                logger.error(f"Error in handler {handler.__name__} for event {event_type}: {e}")
+                logger.error("Error in handler %s for event %s: %s", handler.__name__, event_type, e)
     
     def get_handlers(self, event_type: str) -> List[Callable]:
         """Get handlers for event type."""
@@ -201,7 +201,7 @@ class EventBus:
         """Clear handlers for specific event type or all."""
         if event_type:
             self._handlers.pop(event_type, None)
-            logger.info(f"Cleared handlers for event {event_type}")
+            logger.info("Cleared handlers for event %s", event_type)
         else:
             self._handlers.clear()
             logger.info("Cleared all event handlers")
@@ -227,34 +227,46 @@ def handle_cache_invalidation(event: DomainEvent) -> None:
         from app.core.time import YearMonth
         current_month = YearMonth.current()
         CacheManager.invalidate_budget_cache(user_id, current_month)
-        logger.info(f"Invalidated budget cache for user {user_id} due to {event.event_type}")
+        logger.info("Invalidated budget cache for user %s due to %s", user_id, event.event_type)
     
     elif event.event_type in ['income.updated', 'category.created', 'category.updated']:
         # Invalidate all budget cache for user
         CacheManager.invalidate_budget_cache(user_id)
-        logger.info(f"Invalidated all budget cache for user {user_id} due to {event.event_type}")
+        logger.info("Invalidated all budget cache for user %s due to %s", user_id, event.event_type)
     
     elif event.event_type in ['goal.completed', 'goal.progress_added']:
         # Invalidate goals cache
         CacheManager.invalidate_goals_cache(user_id)
-        logger.info(f"Invalidated goals cache for user {user_id} due to {event.event_type}")
+        logger.info("Invalidated goals cache for user %s due to %s", user_id, event.event_type)
 
 
 def handle_goal_completion_notification(event: GoalCompleted) -> None:
     """Handle goal completion notifications."""
-    logger.info(f"🎉 Goal '{event.title}' completed by user {event.user_id}!")
+    logger.info("🎉 Goal '%s' completed by user %s!", event.title, event.user_id)
     # TODO: Send actual notification (email, push, etc.)
 
 
 def handle_budget_limit_warning(event: ExpenseCreated) -> None:
     """Handle budget limit warnings."""
     # TODO: Check if expense pushes category over limit and send warning
-    logger.debug(f"Checking budget limits for user {event.user_id} after expense {event.expense_id}")
+    logger.debug("Checking budget limits for user %s after expense %s", event.user_id, event.expense_id)
 
 
 # Register default event handlers
+_default_handlers_registered = False
+
+
 def register_default_handlers():
-    """Register default event handlers."""
+    """Register default event handlers.
+
+    The event bus is process-wide, so this runs once no matter how many
+    apps the factory builds.
+    """
+    global _default_handlers_registered
+    if _default_handlers_registered:
+        return
+    _default_handlers_registered = True
+    
     # Cache invalidation
     event_bus.subscribe('expense.created', handle_cache_invalidation)
     event_bus.subscribe('expense.updated', handle_cache_invalidation)
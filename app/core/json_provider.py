@@ -0,0 +1,65 @@
+"""orjson-backed JSON provider for Flask."""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is pinned in requirements.txt
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Drop-in replacement for Flask's JSON provider using orjson.
+
+    Output decodes to the same values as the default provider: keys are
+    sorted, non-str keys are stringified, tuple subclasses become lists and
+    dates/Decimal/UUID go through Flask's own ``default``. Anything orjson
+    rejects (such as integers wider than 64 bits) is encoded by the stdlib.
+    Non-ASCII text is written as UTF-8 instead of ``\\u`` escapes.
+    ``dumps``/``loads`` fall back to the stdlib when called with
+    json-module keyword arguments orjson does not understand.
+    """
+
+    def _default(self, o):
+        # orjson only handles exact tuples; the stdlib emits subclasses such
+        # as YearMonth as lists too
+        if isinstance(o, tuple):
+            return list(o)
+        return self.default(o)
+
+    def _options(self):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, default=self._default, option=self._options()).decode()
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits; let the stdlib decide
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = self._options()
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        # orjson emits bytes, so the body needs no extra str -> UTF-8 encode
+        try:
+            body = orjson.dumps(obj, default=self._default, option=option | orjson.OPT_APPEND_NEWLINE)
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Install the orjson provider when orjson is available."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -80,12 +80,10 @@ def monitor_modal_performance(route_name=None):
                 
                 # Log performance
                 monitoring_logger.info(
-                    f"modal_route={route_name or func.__name__} "
-                    f"duration_ms={duration_ms:.2f} "
-                    f"status=success "
-                    f"user_id={user_id} "
-                    f"modal_enabled={modal_enabled} "
-                    f"path={request.path}"
+                    "modal_route=%s duration_ms=%.2f status=success "
+                    "user_id=%s modal_enabled=%s path=%s",
+                    route_name or func.__name__, duration_ms,
+                    user_id, modal_enabled, request.path
                 )
                 
                 return result
@@ -102,13 +100,10 @@ def monitor_modal_performance(route_name=None):
                     pass
                 
                 monitoring_logger.error(
-                    f"modal_route={route_name or func.__name__} "
-                    f"duration_ms={duration_ms:.2f} "
-                    f"status=error "
-                    f"error={str(e)} "
-                    f"user_id={user_id} "
-                    f"modal_enabled={modal_enabled} "
-                    f"path={request.path}"
+                    "modal_route=%s duration_ms=%.2f status=error error=%s "
+                    "user_id=%s modal_enabled=%s path=%s",
+                    route_name or func.__name__, duration_ms, e,
+                    user_id, modal_enabled, request.path
                 )
                 raise
                 
@@ -126,16 +121,14 @@ def log_bundle_usage():
         modal_metrics.record_bundle_load(bundle_type)
         modal_metrics.record_feature_flag_check()
         
-        monitoring_logger.debug(
-            f"bundle_load=true "
-            f"bundle_type={bundle_type} "
-            f"user_id={user_id} "
-            f"modal_enabled={modal_enabled} "
-            f"path={request.path}"
-        )
+        if monitoring_logger.isEnabledFor(logging.DEBUG):
+            monitoring_logger.debug(
+                "bundle_load=true bundle_type=%s user_id=%s modal_enabled=%s path=%s",
+                bundle_type, user_id, modal_enabled, request.path
+            )
         
     except Exception as e:
-        monitoring_logger.error(f"Failed to log bundle usage: {e}")
+        monitoring_logger.error("Failed to log bundle usage: %s", e)
 
 
 def get_monitoring_stats():
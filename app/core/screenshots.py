@@ -69,7 +69,7 @@ class ScreenshotManager:
                 return self._take_screenshot_chrome(url, filepath, viewport)
                 
         except Exception as e:
-            current_app.logger.error(f"Screenshot failed for {url}: {e}")
+            current_app.logger.error("Screenshot failed for %s: %s", url, e)
             return None
     
     def _has_playwright(self) -> bool:
@@ -226,7 +226,7 @@ class ScreenshotManager:
             return comparison
             
         except Exception as e:
-            current_app.logger.error(f"Screenshot comparison failed: {e}")
+            current_app.logger.error("Screenshot comparison failed: %s", e)
             return None
     
     def capture_page_variants(self, base_url: str, page_name: str, 
@@ -346,7 +346,7 @@ class ScreenshotManager:
         
         self.save_metadata()
         
-        current_app.logger.info(f"Cleaned up {cleaned_count} old screenshots")
+        current_app.logger.info("Cleaned up %s old screenshots", cleaned_count)
 
 
 def create_ui_regression_test(page_name: str, test_scenarios: List[Dict]) -> bool:
@@ -370,11 +370,11 @@ def create_ui_regression_test(page_name: str, test_scenarios: List[Dict]) -> boo
                 result['scenario'] = scenario_name
                 all_results.append(result)
         
-        current_app.logger.info(f"Created UI regression test for {page_name}: {len(all_results)} screenshots")
+        current_app.logger.info("Created UI regression test for %s: %s screenshots", page_name, len(all_results))
         return True
         
     except Exception as e:
-        current_app.logger.error(f"Failed to create UI regression test: {e}")
+        current_app.logger.error("Failed to create UI regression test: %s", e)
         return False
 
 
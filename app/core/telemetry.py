@@ -32,11 +32,12 @@ class ModalTelemetry:
         try:
             # Log to file for analysis
             telemetry_logger.info(
-                f"modal_event={event_type} "
-                f"modal_name={modal_name} "
-                f"user_id={user_id} "
-                f"duration_ms={data.get('duration_ms', 0) if data else 0} "
-                f"success={data.get('success', True) if data else True}"
+                "modal_event=%s modal_name=%s user_id=%s duration_ms=%s success=%s",
+                event_type,
+                modal_name,
+                user_id,
+                data.get('duration_ms', 0) if data else 0,
+                data.get('success', True) if data else True,
             )
             
             # Store in database if available
@@ -45,7 +46,7 @@ class ModalTelemetry:
                 
         except Exception as e:
             # Don't break application for telemetry failures
-            telemetry_logger.error(f"Failed to record telemetry: {e}")
+            telemetry_logger.error("Failed to record telemetry: %s", e)
     
     @staticmethod
     def _store_event_db(event_data):
@@ -84,7 +85,7 @@ class ModalTelemetry:
                 conn.commit()
                 
         except Exception as e:
-            telemetry_logger.error(f"Failed to store event in database: {e}")
+            telemetry_logger.error("Failed to store event in database: %s", e)
     
     @staticmethod
     def get_telemetry_summary(hours=24):
@@ -108,7 +109,7 @@ class ModalTelemetry:
                 return [dict(row._mapping) for row in result]
                 
         except Exception as e:
-            telemetry_logger.error(f"Failed to get telemetry summary: {e}")
+            telemetry_logger.error("Failed to get telemetry summary: %s", e)
             return []
 
 
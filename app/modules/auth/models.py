@@ -5,6 +5,14 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from app.core.extensions import db
 
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # pragma: no cover - falls back to werkzeug PBKDF2 hashes
+    PasswordHasher = None
+
+_password_hasher = PasswordHasher() if PasswordHasher else None
+
 
 class User(UserMixin, db.Model):
     """User model with email and Telegram authentication support."""
@@ -52,12 +60,32 @@ class User(UserMixin, db.Model):
         return f'<User {self.name}>'
     
     def set_password(self, password):
-        """Set password hash."""
-        self.password_hash = generate_password_hash(password)
+        """Set password hash (argon2 when available)."""
+        if _password_hasher:
+            self.password_hash = _password_hasher.hash(password)
+        else:
+            self.password_hash = generate_password_hash(password)
     
     def check_password(self, password):
-        """Check password against hash."""
-        return check_password_hash(self.password_hash, password)
+        """Check password against hash.
+
+        Legacy werkzeug hashes are still accepted and upgraded to argon2 on
+        a successful check; the caller's commit persists the new hash.
+        """
+        if _password_hasher and self.password_hash.startswith('$argon2'):
+            try:
+                _password_hasher.verify(self.password_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+            if _password_hasher.check_needs_rehash(self.password_hash):
+                self.password_hash = _password_hasher.hash(password)
+            return True
+        
+        if not check_password_hash(self.password_hash, password):
+            return False
+        if _password_hasher:
+            self.password_hash = _password_hasher.hash(password)
+        return True
     
     @property
     def is_telegram_user(self):
@@ -173,7 +173,7 @@ def change_password():
 @login_required
 def set_theme():
     """Set user theme preference."""
-    data = request.get_json(silent=True) or {}
+    data = request.get_json(silent=True, cache=False) or {}
     theme = (data.get("theme") or "").lower()
     if theme not in ("light", "dark"):
         return jsonify({"ok": False, "error": "bad theme"}), 400
@@ -229,13 +229,13 @@ def settings_save_profile():
         session['user_name'] = name
         session['currency'] = currency
 
-        current_app.logger.info(f'Profile updated for user ID: {user.id} - currency: {currency}')
+        current_app.logger.info('Profile updated for user ID: %s - currency: %s', user.id, currency)
         flash('Профиль успешно обновлен', 'success')
         return redirect(url_for('auth.settings'))
 
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f"Error saving profile settings: {e}")
+        current_app.logger.error("Error saving profile settings: %s", e)
         flash('Ошибка сохранения профиля', 'error')
         return redirect(url_for('auth.settings'))
 
@@ -268,7 +268,7 @@ def settings_save_interface():
         return redirect(url_for('auth.settings'))
 
     except Exception as e:
-        current_app.logger.error(f"Error saving interface settings: {e}")
+        current_app.logger.error("Error saving interface settings: %s", e)
         flash('Ошибка сохранения настроек', 'error')
         return redirect(url_for('auth.settings'))
 
@@ -286,7 +286,7 @@ def settings_export_data():
         return redirect(url_for('auth.settings'))
         
     except Exception as e:
-        current_app.logger.error(f"Error exporting data: {e}")
+        current_app.logger.error("Error exporting data: %s", e)
         flash('Ошибка экспорта данных', 'error')
         return redirect(url_for('auth.settings'))
 
@@ -301,7 +301,7 @@ def settings_import_data():
         return redirect(url_for('auth.settings'))
         
     except Exception as e:
-        current_app.logger.error(f"Error importing data: {e}")
+        current_app.logger.error("Error importing data: %s", e)
         flash('Ошибка импорта данных', 'error')
         return redirect(url_for('auth.settings'))
 
@@ -323,7 +323,7 @@ def settings_clear_data():
         return redirect(url_for('auth.settings'))
         
     except Exception as e:
-        current_app.logger.error(f"Error clearing data: {e}")
+        current_app.logger.error("Error clearing data: %s", e)
         flash('Ошибка очистки данных', 'error')
         return redirect(url_for('auth.settings'))
 
@@ -362,7 +362,7 @@ def settings_delete_account():
         return redirect(url_for('auth.settings'))
         
     except Exception as e:
-        current_app.logger.error(f"Error deleting account: {e}")
+        current_app.logger.error("Error deleting account: %s", e)
         flash('Ошибка удаления аккаунта', 'error')
         return redirect(url_for('auth.settings'))
 
@@ -408,7 +408,7 @@ def create_family_access():
     except ValueError as e:
         flash(str(e), 'error')
     except Exception as e:
-        current_app.logger.error(f"Error creating family access: {e}")
+        current_app.logger.error("Error creating family access: %s", e)
         flash('Ошибка при создании семейного доступа', 'error')
 
     return redirect(url_for('auth.family_settings'))
@@ -436,7 +436,7 @@ def join_family():
     except ValueError as e:
         flash(str(e), 'error')
     except Exception as e:
-        current_app.logger.error(f"Error joining family: {e}")
+        current_app.logger.error("Error joining family: %s", e)
         flash('Ошибка при присоединении к семье', 'error')
 
     return redirect(url_for('auth.family_settings'))
@@ -456,7 +456,7 @@ def leave_family():
         else:
             flash('Вы не состоите в семейном доступе', 'error')
     except Exception as e:
-        current_app.logger.error(f"Error leaving family: {e}")
+        current_app.logger.error("Error leaving family: %s", e)
         flash('Ошибка при выходе из семейного доступа', 'error')
 
     return redirect(url_for('auth.family_settings'))
\ No newline at end of file
@@ -31,10 +31,10 @@ class AuthService:
                 auth_timestamp = int(auth_date)
                 current_timestamp = int(time.time())
                 if current_timestamp - auth_timestamp > max_age_sec:
-                    current_app.logger.warning(f"Telegram auth expired: {current_timestamp - auth_timestamp}s old")
+                    current_app.logger.warning("Telegram auth expired: %ss old", current_timestamp - auth_timestamp)
                     return False
             except ValueError:
-                current_app.logger.warning(f"Invalid auth_date format: {auth_date}")
+                current_app.logger.warning("Invalid auth_date format: %s", auth_date)
                 return False
         
         # Build data string for verification
@@ -89,11 +89,11 @@ class AuthService:
         """Authenticate or register user via Telegram."""
         # Verify Telegram data
         if bot_token and not AuthService.verify_telegram_auth(telegram_data, bot_token):
-            current_app.logger.warning(f'Invalid Telegram auth hash for ID: {telegram_data.get("id")}')
+            current_app.logger.warning('Invalid Telegram auth hash for ID: %s', telegram_data.get("id"))
             return None
         
         telegram_id = telegram_data['id']
-        current_app.logger.info(f'Telegram auth attempt for ID: {telegram_id}')
+        current_app.logger.info('Telegram auth attempt for ID: %s', telegram_id)
         
         # Try to find existing user
         user = User.find_by_telegram_id(telegram_id)
@@ -101,7 +101,7 @@ class AuthService:
         if user:
             # Update user's Telegram data
             user.update_telegram_data(telegram_data)
-            current_app.logger.info(f'Existing Telegram user logged in: {telegram_id} (ID: {user.id})')
+            current_app.logger.info('Existing Telegram user logged in: %s (ID: %s)', telegram_id, user.id)
             return user
         else:
             # Check if user has current session and merge accounts
@@ -112,12 +112,12 @@ class AuthService:
                     # Merge accounts
                     current_user.telegram_id = telegram_id
                     current_user.update_telegram_data(telegram_data)
-                    current_app.logger.info(f'Merged Telegram account with existing user: {current_user_id}')
+                    current_app.logger.info('Merged Telegram account with existing user: %s', current_user_id)
                     return current_user
             
             # Create new Telegram user
             user = User.create_telegram_user(telegram_data)
-            current_app.logger.info(f'Created new Telegram user: {telegram_id} (ID: {user.id})')
+            current_app.logger.info('Created new Telegram user: %s (ID: %s)', telegram_id, user.id)
             return user
     
     @staticmethod
@@ -126,10 +126,13 @@ class AuthService:
         user = User.find_by_email(email)
         
         if user and user.check_password(password):
-            current_app.logger.info(f'Successful email login: {email} (ID: {user.id})')
+            if db.session.is_modified(user):
+                # check_password upgraded a legacy hash
+                db.session.commit()
+            current_app.logger.info('Successful email login: %s (ID: %s)', email, user.id)
             return user
         
-        current_app.logger.warning(f'Failed email login: {email}')
+        current_app.logger.warning('Failed email login: %s', email)
         return None
     
     @staticmethod
@@ -151,12 +154,12 @@ class AuthService:
             db.session.add(user)
             db.session.commit()
             
-            current_app.logger.info(f'Successful email registration: {email} (ID: {user.id})')
+            current_app.logger.info('Successful email registration: %s (ID: %s)', email, user.id)
             return user
             
         except Exception as e:
             db.session.rollback()
-            current_app.logger.error(f'Database error during email registration for {email}: {e}')
+            current_app.logger.error('Database error during email registration for %s: %s', email, e)
             flash("Ошибка сервера. Попробуйте позже", "error")
             return None
     
@@ -170,11 +173,11 @@ class AuthService:
         try:
             user.set_password(new_password)
             db.session.commit()
-            current_app.logger.info(f'Password changed for user ID: {user.id}')
+            current_app.logger.info('Password changed for user ID: %s', user.id)
             return True
         except Exception as e:
             db.session.rollback()
-            current_app.logger.error(f'Error changing password for user {user.id}: {e}')
+            current_app.logger.error('Error changing password for user %s: %s', user.id, e)
             flash("Ошибка при изменении пароля", "error")
             return False
     
@@ -194,10 +197,10 @@ class AuthService:
             if 'currency' in preferences:
                 session['currency'] = preferences['currency']
             
-            current_app.logger.info(f'Updated preferences for user ID: {user.id}')
+            current_app.logger.info('Updated preferences for user ID: %s', user.id)
             return True
             
         except Exception as e:
             db.session.rollback()
-            current_app.logger.error(f'Error updating preferences for user {user.id}: {e}')
+            current_app.logger.error('Error updating preferences for user %s: %s', user.id, e)
             return False
\ No newline at end of file
@@ -66,6 +66,9 @@ class Expense(db.Model):
     carryover_from_month = db.Column(db.String(7), nullable=True)  # YYYY-MM format for carryover tracking
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Month listings filter by user, date range and optionally category
+    __table_args__ = (db.Index('ix_expenses_user_date_category', 'user_id', 'date', 'category_id'),)
+    
     def __repr__(self):
         return f'<Expense {self.amount} {self.currency}>'
     
@@ -264,4 +267,19 @@ class CategoryIncomeSource(db.Model):
         if self.limit_type == 'percent':
             return f"{self.percentage}%"
         else:
-            return f"{self.fixed_amount} ₽"
\ No newline at end of file
+            return f"{self.fixed_amount} ₽"
+
+
+class UserDataVersion(db.Model):
+    """Per-user token that moves on every committed budget write.
+
+    Kept in the database so every worker process sees the same value; cache
+    keys and API ETags are derived from it.
+    """
+    __tablename__ = 'user_data_versions'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<UserDataVersion {self.user_id}: {self.version}>'
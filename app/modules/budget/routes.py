@@ -1016,7 +1016,7 @@ def add_income_source():
         flash(f'Источник дохода "{name}" создан', 'success')
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f'Error creating income source for user {user_id}: {str(e)}')
+        current_app.logger.error('Error creating income source for user %s: %s', user_id, e)
         flash('Ошибка при создании источника дохода', 'error')
     
     return redirect(url_for('budget.categories'))
@@ -1070,12 +1070,12 @@ def delete_income_source(source_id):
         from app.core.caching import CacheManager
         CacheManager.invalidate_budget_cache(user_id)
         
-        current_app.logger.info(f'Deleted income source {source_name} for user {user_id}')
+        current_app.logger.info('Deleted income source %s for user %s', source_name, user_id)
         flash(f'Источник дохода "{source_name}" удален', 'success')
         
     except Exception as e:
         db.session.rollback()
-        current_app.logger.error(f'Error deleting income source {source_id} for user {user_id}: {str(e)}')
+        current_app.logger.error('Error deleting income source %s for user %s: %s', source_id, user_id, e)
         flash('Ошибка при удалении источника дохода', 'error')
     
     return redirect(url_for('budget.categories'))
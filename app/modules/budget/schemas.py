@@ -136,50 +136,96 @@ class ExpenseData:
                 raise ValueError(f'Field {field} is required')
             cleaned[field] = data[field]
         
-        # Validate amount
+        cleaned['amount'] = ExpenseData._clean_amount(data['amount'])
+        cleaned['category_id'] = ExpenseData._clean_category_id(data['category_id'])
+        
+        # Optional fields
+        description = ExpenseData._clean_description(data)
+        if description is not None:
+            cleaned['description'] = description
+        
+        if 'currency' in data and data['currency'] in SUPPORTED_CURRENCIES:
+            cleaned['currency'] = data['currency']
+        else:
+            cleaned['currency'] = 'RUB'
+        
+        # Date validation
+        if 'date' in data:
+            cleaned['date'] = ExpenseData._clean_date(data['date'])
+        else:
+            cleaned['date'] = datetime.utcnow().date()
+        
+        return cleaned
+    
+    @staticmethod
+    def validate_partial(data: dict) -> dict:
+        """Validate only the fields present in data (for partial updates).
+
+        Unlike validate(), missing fields get no defaults, so they are left
+        untouched by the update.
+        """
+        cleaned = {}
+        
+        if 'amount' in data:
+            cleaned['amount'] = ExpenseData._clean_amount(data['amount'])
+        if 'category_id' in data:
+            cleaned['category_id'] = ExpenseData._clean_category_id(data['category_id'])
+        
+        description = ExpenseData._clean_description(data)
+        if description is not None:
+            cleaned['description'] = description
+        
+        if 'currency' in data:
+            if data['currency'] not in SUPPORTED_CURRENCIES:
+                raise ValueError('Unsupported currency')
+            cleaned['currency'] = data['currency']
+        
+        if 'date' in data:
+            cleaned['date'] = ExpenseData._clean_date(data['date'])
+        
+        if not cleaned:
+            raise ValueError('No fields to update')
+        
+        return cleaned
+    
+    @staticmethod
+    def _clean_amount(value) -> float:
         try:
-            amount = float(data['amount'])
+            amount = float(value)
             if amount <= 0:
                 raise ValueError('Amount must be positive')
-            cleaned['amount'] = amount
+            return amount
         except (ValueError, TypeError):
             raise ValueError('Invalid amount format')
-        
-        # Validate category_id
+    
+    @staticmethod
+    def _clean_category_id(value) -> int:
         try:
-            cleaned['category_id'] = int(data['category_id'])
+            return int(value)
         except (ValueError, TypeError):
             raise ValueError('Invalid category ID')
-        
-        # Optional fields
+    
+    @staticmethod
+    def _clean_description(data: dict):
         # Accept both 'description' and legacy 'note' from frontend
         if 'description' in data and data['description'] is not None:
             desc = str(data['description']).strip()
             if len(desc) <= 500:
-                cleaned['description'] = desc
+                return desc
         elif 'note' in data and data['note'] is not None:
             note = str(data['note']).strip()
             if len(note) <= 500:
-                cleaned['description'] = note
-        
-        if 'currency' in data and data['currency'] in SUPPORTED_CURRENCIES:
-            cleaned['currency'] = data['currency']
-        else:
-            cleaned['currency'] = 'RUB'
-        
-        # Date validation
-        if 'date' in data:
-            if isinstance(data['date'], str):
-                try:
-                    cleaned['date'] = datetime.strptime(data['date'], '%Y-%m-%d').date()
-                except ValueError:
-                    raise ValueError('Invalid date format (use YYYY-MM-DD)')
-            else:
-                cleaned['date'] = data['date']
-        else:
-            cleaned['date'] = datetime.utcnow().date()
-        
-        return cleaned
+                return note
+        return None
+    
+    @staticmethod
+    def _clean_date(value):
+        if isinstance(value, str):
+            try:
+                return datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError('Invalid date format (use YYYY-MM-DD)')
+        return value
 
 
 class CategoryData:
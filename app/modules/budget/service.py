@@ -2,7 +2,8 @@
 from typing import List, Dict, Optional, Tuple
 from decimal import Decimal
 from datetime import datetime, date
-from sqlalchemy import func, extract, text
+from sqlalchemy import func, extract, text, tuple_, select, lambda_stmt
+from sqlalchemy.orm import selectinload
 from flask import current_app
 from app.core.extensions import db
 from app.core.money import Money, SUPPORTED_CURRENCIES, get_user_currency
@@ -60,7 +61,7 @@ class BudgetService:
         # Invalidate cache for all family members
         BudgetService._invalidate_family_cache(user_id)
 
-        current_app.logger.info(f'Created category {name} for user {user_id}')
+        current_app.logger.info('Created category %s for user %s', name, user_id)
         return category
     
     @staticmethod
@@ -79,7 +80,7 @@ class BudgetService:
         # Invalidate cache for all family members
         BudgetService._invalidate_family_cache(user_id)
 
-        current_app.logger.info(f'Updated category {category_id} for user {user_id}')
+        current_app.logger.info('Updated category %s for user %s', category_id, user_id)
         return category
     
     @staticmethod
@@ -95,7 +96,7 @@ class BudgetService:
         # Invalidate cache for all family members
         BudgetService._invalidate_family_cache(user_id)
 
-        current_app.logger.info(f'Deleted category {category_id} for user {user_id}')
+        current_app.logger.info('Deleted category %s for user %s', category_id, user_id)
         return True
     
     @staticmethod
@@ -128,7 +129,7 @@ class BudgetService:
                 rows = db.session.execute(text("PRAGMA table_info(expenses)")).fetchall()
                 return {row[1] for row in rows}  # row[1] is 'name'
             except Exception as e:
-                current_app.logger.warning(f"Could not introspect expenses table schema: {e}")
+                current_app.logger.warning("Could not introspect expenses table schema: %s", e)
                 # Fallback: assume modern columns
                 return {
                     'id', 'user_id', 'category_id', 'amount', 'description',
@@ -189,7 +190,7 @@ class BudgetService:
         except Exception as raw_insert_error:
             # If raw path fails for any reason, try ORM insert as a fallback
             db.session.rollback()
-            current_app.logger.warning(f"Raw INSERT path failed, fallback to ORM insert: {raw_insert_error}")
+            current_app.logger.warning("Raw INSERT path failed, fallback to ORM insert: %s", raw_insert_error)
 
             expense = Expense(
                 user_id=user_id,
@@ -209,38 +210,156 @@ class BudgetService:
         # Invalidate cache for that month
         CacheManager.invalidate_budget_cache(user_id, year_month)
 
-        current_app.logger.info(f'Added expense {amount} {currency} for user {user_id}')
+        current_app.logger.info('Added expense %s %s for user %s', amount, currency, user_id)
         return expense
     
+    @staticmethod
+    def _month_expenses_filters(family_ids: List[int], start_date: date, end_date: date) -> list:
+        """WHERE criteria for the real expenses of family_ids between two dates."""
+        return [
+            Expense.user_id.in_(family_ids),
+            Expense.date >= start_date,
+            Expense.date <= end_date,
+            Expense.transaction_type == 'expense'  # Only real expenses, not carryover
+        ]
+
     @staticmethod
     def get_expenses_for_month(user_id: int, year_month: YearMonth,
                              limit: Optional[int] = None, offset: int = 0,
                              category_id: Optional[int] = None) -> List[Expense]:
         """Get expenses for user and their family in given month with optional pagination and filtering."""
-        start_date = year_month.to_date()
-        end_date = year_month.last_day()
-
         family_ids = BudgetService._get_family_user_ids(user_id)
-
-        query = Expense.query.filter(
-            Expense.user_id.in_(family_ids),
-            Expense.date >= start_date,
-            Expense.date <= end_date,
-            Expense.transaction_type == 'expense'  # Only real expenses, not carryover
-        )
+        query = Expense.query.filter(*BudgetService._month_expenses_filters(
+            family_ids, year_month.to_date(), year_month.last_day()))
 
         # Optional category filter
         if category_id:
             query = query.filter(Expense.category_id == category_id)
 
-        query = query.order_by(Expense.date.desc())
+        query = query.options(selectinload(Expense.category)).order_by(Expense.date.desc(), Expense.id.desc())
 
         # Optional pagination
         if limit:
             query = query.offset(offset).limit(limit)
 
         return query.all()
-    
+
+    @staticmethod
+    def get_expenses_page(user_id: int, year_month: YearMonth, category_id: Optional[int] = None,
+                          limit: int = 50, offset: int = 0,
+                          cursor: Optional[Tuple[date, int]] = None,
+                          with_total: bool = False) -> Tuple[list, Optional[int]]:
+        """Get one page of month expenses, plus the total row count on request.
+
+        Read-only listing path: returns Core rows (id, category_id,
+        category_name, amount, currency, description, date, created_at)
+        instead of ORM objects, so no identity map or attribute
+        instrumentation is involved. The total needs a separate COUNT over
+        the same filters, so it is skipped (None) unless with_total is set.
+        With a (date, id) cursor the page starts right after that row via an
+        index seek and offset is ignored.
+        """
+        family_ids = BudgetService._get_family_user_ids(user_id)
+        start_date = year_month.to_date()
+        end_date = year_month.last_day()
+
+        # Lambda statements: SQLAlchemy caches each variant by the lambdas'
+        # code and binds the closure values, so per-request statement
+        # construction is skipped
+        def filtered(stmt):
+            stmt += lambda s: s.where(*BudgetService._month_expenses_filters(family_ids, start_date, end_date))
+            if category_id:
+                stmt += lambda s: s.where(Expense.category_id == category_id)
+            return stmt
+
+        total = None
+        if with_total:
+            count_stmt = filtered(lambda_stmt(lambda: select(func.count(Expense.id))))
+            total = db.session.execute(count_stmt).scalar() or 0
+
+        stmt = filtered(lambda_stmt(lambda: (
+            select(Expense.id, Expense.category_id, Category.name.label('category_name'),
+                   Expense.amount, Expense.currency, Expense.description,
+                   Expense.date, Expense.created_at)
+            .outerjoin(Category, Category.id == Expense.category_id)
+        )))
+        if cursor is not None:
+            cursor_date, cursor_id = cursor
+            stmt += lambda s: s.where(tuple_(Expense.date, Expense.id) < tuple_(cursor_date, cursor_id))
+            offset = 0
+        stmt += lambda s: s.order_by(Expense.date.desc(), Expense.id.desc()).limit(limit).offset(offset)
+
+        return db.session.execute(stmt).all(), total
+
+    @staticmethod
+    def update_expense(expense_id: int, user_id: int, **kwargs) -> Optional[Expense]:
+        """Update expense (with permission check)."""
+        expense = Expense.query.get(expense_id)
+        if not expense:
+            return None
+
+        # Check if user can edit this expense
+        if not expense.can_edit(user_id):
+            return None
+
+        # Update allowed fields that actually change
+        allowed_fields = ["amount", "description", "date", "category_id", "currency"]
+        changes = {}
+        for key, value in kwargs.items():
+            if key in allowed_fields and hasattr(expense, key):
+                current = getattr(expense, key)
+                if key == 'amount' and value is not None:
+                    value = Decimal(str(value))
+                if current != value:
+                    changes[key] = value
+
+        # Nothing to write: skip the UPDATE and cache invalidation
+        if not changes:
+            return expense
+
+        for key, value in changes.items():
+            setattr(expense, key, value)
+
+        db.session.commit()
+
+        # Invalidate cache for all relevant users
+        CacheManager.invalidate_budget_cache(expense.user_id)
+        if expense.shared_budget_id:
+            from app.modules.goals.models import SharedBudgetMember
+            members = SharedBudgetMember.query.filter_by(budget_id=expense.shared_budget_id).all()
+            for member in members:
+                CacheManager.invalidate_budget_cache(member.user_id)
+
+        current_app.logger.info("Updated expense %s by user %s", expense_id, user_id)
+        return expense
+
+    @staticmethod
+    def delete_expense(expense_id: int, user_id: int) -> bool:
+        """Delete expense (with permission check)."""
+        expense = Expense.query.get(expense_id)
+        if not expense:
+            return False
+
+        # Check if user can edit this expense
+        if not expense.can_edit(user_id):
+            return False
+
+        shared_budget_id = expense.shared_budget_id
+        expense_user_id = expense.user_id
+
+        db.session.delete(expense)
+        db.session.commit()
+
+        # Invalidate cache for all relevant users
+        CacheManager.invalidate_budget_cache(expense_user_id)
+        if shared_budget_id:
+            from app.modules.goals.models import SharedBudgetMember
+            members = SharedBudgetMember.query.filter_by(budget_id=shared_budget_id).all()
+            for member in members:
+                CacheManager.invalidate_budget_cache(member.user_id)
+
+        current_app.logger.info("Deleted expense %s by user %s", expense_id, user_id)
+        return True
     
     @staticmethod
     def add_income(user_id: int, source_name: str, amount: Decimal, 
@@ -298,7 +417,7 @@ class BudgetService:
         year_month = YearMonth(year, month)
         CacheManager.invalidate_budget_cache(user_id, year_month)
         
-        current_app.logger.info(f'Added income {amount} {currency} for user {user_id}')
+        current_app.logger.info('Added income %s %s for user %s', amount, currency, user_id)
         return income
 
     @staticmethod
@@ -344,7 +463,7 @@ class BudgetService:
             new_year_month = YearMonth(year, month)
             CacheManager.invalidate_budget_cache(user_id, new_year_month)
         
-        current_app.logger.info(f'Updated income {income_id} for user {user_id}')
+        current_app.logger.info('Updated income %s for user %s', income_id, user_id)
         return income
 
     @staticmethod
@@ -390,13 +509,13 @@ class BudgetService:
                 # Delete the source
                 db.session.delete(source)
                 db.session.commit()
-                current_app.logger.info(f'Auto-deleted income source "{source_name}" (no more incomes using it)')
+                current_app.logger.info('Auto-deleted income source "%s" (no more incomes using it)', source_name)
 
         # Invalidate cache if we have date info
         if year_month:
             CacheManager.invalidate_budget_cache(user_id, year_month)
 
-        current_app.logger.info(f'Deleted income {income_id} for user {user_id}')
+        current_app.logger.info('Deleted income %s for user %s', income_id, user_id)
         return True
     
     @staticmethod
@@ -428,9 +547,14 @@ class BudgetService:
         return query.all()
     
     @staticmethod
-    def get_total_income_for_month(user_id: int, year_month: YearMonth) -> Money:
-        """Get total income for month."""
-        incomes = BudgetService.get_income_for_month(user_id, year_month)
+    def get_total_income_for_month(user_id: int, year_month: YearMonth,
+                                   incomes: Optional[List[Income]] = None) -> Money:
+        """Get total income for month.
+
+        Pass incomes when the month's list is already loaded to skip the query.
+        """
+        if incomes is None:
+            incomes = BudgetService.get_income_for_month(user_id, year_month)
         total = sum(income.money_amount.amount for income in incomes)
         
         # Use RUB as default currency for calculations outside of request context
@@ -446,24 +570,31 @@ class BudgetService:
     @staticmethod
     def get_category_spending_summary(user_id: int, year_month: YearMonth) -> Dict[int, Decimal]:
         """Get category spending summary for user and family with SQL GROUP BY."""
+        # Return as dict for O(1) lookup
+        return {
+            cat_id: total
+            for cat_id, total, _ in BudgetService._category_spending_rows(user_id, year_month)
+        }
+    
+    @staticmethod
+    def _category_spending_rows(user_id: int, year_month: YearMonth) -> List:
+        """(category_id, total_amount, expense_count) rows for user and family."""
         start_date = year_month.to_date()
         end_date = year_month.last_day()
 
         family_ids = BudgetService._get_family_user_ids(user_id)
 
         # SQL aggregate query - much faster than Python grouping
-        spending_data = db.session.query(
+        return db.session.query(
             Expense.category_id,
-            func.sum(Expense.amount).label('total_amount')
+            func.sum(Expense.amount).label('total_amount'),
+            func.count(Expense.id).label('expense_count')
         ).filter(
             Expense.user_id.in_(family_ids),
             Expense.date >= start_date,
             Expense.date <= end_date,
             Expense.transaction_type == 'expense'  # Only real expenses
         ).group_by(Expense.category_id).all()
-
-        # Return as dict for O(1) lookup
-        return {cat_id: total for cat_id, total in spending_data}
     
     @staticmethod
     # @cached_per_user_month(timeout=300)  # Temporarily disabled for stabilization
@@ -472,8 +603,12 @@ class BudgetService:
         categories = BudgetService.get_user_categories(user_id)
         total_income = BudgetService.get_total_income_for_month(user_id, year_month)
         
-        # Get category spending summary with SQL GROUP BY
-        spending_by_category = BudgetService.get_category_spending_summary(user_id, year_month)
+        # Get category spending and expense counts with one SQL GROUP BY
+        spending_by_category = {}
+        counts_by_category = {}
+        for cat_id, total, count in BudgetService._category_spending_rows(user_id, year_month):
+            spending_by_category[cat_id] = total
+            counts_by_category[cat_id] = count
         
         # Calculate category summaries
         category_summaries = []
@@ -518,6 +653,7 @@ class BudgetService:
                 'carryover': carryover_info,
                 'remaining': remaining,
                 'is_overspent': is_overspent,
+                'expenses_count': counts_by_category.get(category.id, 0),
                 'percentage_used': (spent_money.amount / effective_limit.amount * 100) if effective_limit.amount > 0 else 0
             })
             
@@ -673,7 +809,7 @@ class CurrencyService:
             return rate.rate
         
         # TODO: Fetch from external API and cache
-        current_app.logger.warning(f'No exchange rate found for {from_currency}/{to_currency}')
+        current_app.logger.warning('No exchange rate found for %s/%s', from_currency, to_currency)
         return None
     
     @staticmethod
@@ -845,7 +981,7 @@ class DashboardService:
         # Invalidate cache
         CacheManager.invalidate_budget_cache(user_id)
         
-        current_app.logger.info(f'Deleted income source {source.name} for user {user_id}')
+        current_app.logger.info('Deleted income source %s for user %s', source.name, user_id)
         return True
     
     @staticmethod
@@ -972,7 +1108,7 @@ class DashboardService:
                         to_month=to_month
                     )
 
-        current_app.logger.info(f'Processed carryovers from {from_month} to {to_month} for user {user_id}')
+        current_app.logger.info('Processed carryovers from %s to %s for user %s', from_month, to_month, user_id)
     
     @staticmethod
     def clear_carryovers_for_month(user_id: int, year_month: YearMonth):
@@ -1017,7 +1153,7 @@ class DashboardService:
         # Invalidate cache
         CacheManager.invalidate_budget_cache(user_id)
         
-        current_app.logger.info(f'Deleted income source {source.name} for user {user_id}')
+        current_app.logger.info('Deleted income source %s for user %s', source.name, user_id)
         return True
 
     # === Shared Budget Methods ===
@@ -1070,64 +1206,6 @@ class DashboardService:
 
         return query.order_by(Expense.date.desc(), Expense.created_at.desc()).all()
 
-    @staticmethod
-    def update_expense(expense_id: int, user_id: int, **kwargs) -> Optional[Expense]:
-        """Update expense (with permission check)."""
-        expense = Expense.query.get(expense_id)
-        if not expense:
-            return None
-
-        # Check if user can edit this expense
-        if not expense.can_edit(user_id):
-            return None
-
-        # Update allowed fields
-        allowed_fields = ["amount", "description", "date", "category_id", "currency"]
-        for key, value in kwargs.items():
-            if key in allowed_fields and hasattr(expense, key):
-                setattr(expense, key, value)
-
-        db.session.commit()
-
-        # Invalidate cache for all relevant users
-        CacheManager.invalidate_budget_cache(expense.user_id)
-        if expense.shared_budget_id:
-            from app.modules.goals.models import SharedBudgetMember
-            members = SharedBudgetMember.query.filter_by(budget_id=expense.shared_budget_id).all()
-            for member in members:
-                CacheManager.invalidate_budget_cache(member.user_id)
-
-        current_app.logger.info(f"Updated expense {expense_id} by user {user_id}")
-        return expense
-
-    @staticmethod
-    def delete_expense(expense_id: int, user_id: int) -> bool:
-        """Delete expense (with permission check)."""
-        expense = Expense.query.get(expense_id)
-        if not expense:
-            return False
-
-        # Check if user can edit this expense
-        if not expense.can_edit(user_id):
-            return False
-
-        shared_budget_id = expense.shared_budget_id
-        expense_user_id = expense.user_id
-
-        db.session.delete(expense)
-        db.session.commit()
-
-        # Invalidate cache for all relevant users
-        CacheManager.invalidate_budget_cache(expense_user_id)
-        if shared_budget_id:
-            from app.modules.goals.models import SharedBudgetMember
-            members = SharedBudgetMember.query.filter_by(budget_id=shared_budget_id).all()
-            for member in members:
-                CacheManager.invalidate_budget_cache(member.user_id)
-
-        current_app.logger.info(f"Deleted expense {expense_id} by user {user_id}")
-        return True
-
     @staticmethod
     def get_shared_budget_categories(shared_budget_id: int, user_id: int) -> List[Category]:
         """Get categories for shared budget (if user has access)."""
@@ -10,7 +10,7 @@ class SavingsGoal(db.Model):
     __tablename__ = 'savings_goals'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     target_amount = db.Column(db.Numeric(10, 2), nullable=False)
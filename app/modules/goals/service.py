@@ -1,8 +1,9 @@
 """Goals service layer."""
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from decimal import Decimal
 from datetime import datetime, date
 from flask import current_app
+from sqlalchemy.orm import selectinload
 from app.core.extensions import db
 from app.core.money import Money
 from app.core.caching import CacheManager
@@ -37,7 +38,7 @@ class GoalsService:
         # Invalidate cache
         CacheManager.invalidate_goals_cache(user_id)
         
-        current_app.logger.info(f'Created savings goal {title} for user {user_id}')
+        current_app.logger.info('Created savings goal %s for user %s', title, user_id)
         return goal
     
     @staticmethod
@@ -56,7 +57,7 @@ class GoalsService:
         # Invalidate cache
         CacheManager.invalidate_goals_cache(user_id)
         
-        current_app.logger.info(f'Updated savings goal {goal_id} for user {user_id}')
+        current_app.logger.info('Updated savings goal %s for user %s', goal_id, user_id)
         return goal
     
     @staticmethod
@@ -72,7 +73,7 @@ class GoalsService:
         # Invalidate cache
         CacheManager.invalidate_goals_cache(user_id)
         
-        current_app.logger.info(f'Deleted savings goal {goal_id} for user {user_id}')
+        current_app.logger.info('Deleted savings goal %s for user %s', goal_id, user_id)
         return True
     
     @staticmethod
@@ -87,13 +88,13 @@ class GoalsService:
         
         # Check if goal was just completed
         if not old_completed and goal.completed:
-            current_app.logger.info(f'Savings goal {goal_id} completed for user {user_id}!')
+            current_app.logger.info('Savings goal %s completed for user %s!', goal_id, user_id)
             # TODO: Send notification
         
         # Invalidate cache
         CacheManager.invalidate_goals_cache(user_id)
         
-        current_app.logger.info(f'Added {amount} progress to goal {goal_id} for user {user_id}')
+        current_app.logger.info('Added %s progress to goal %s for user %s', amount, goal_id, user_id)
         return goal
     
     @staticmethod
@@ -155,7 +156,7 @@ class SharedBudgetService:
         db.session.add(member)
         db.session.commit()
         
-        current_app.logger.info(f'Created shared budget {name} for user {user_id}')
+        current_app.logger.info('Created shared budget %s for user %s', name, user_id)
         return budget
     
     @staticmethod
@@ -183,7 +184,7 @@ class SharedBudgetService:
         db.session.add(member)
         db.session.commit()
         
-        current_app.logger.info(f'User {user_id} joined shared budget {budget.id}')
+        current_app.logger.info('User %s joined shared budget %s', user_id, budget.id)
         return budget
     
     @staticmethod
@@ -197,6 +198,21 @@ class SharedBudgetService:
         
         return SharedBudget.query.filter(SharedBudget.id.in_(budget_ids)).all()
     
+    @staticmethod
+    def get_user_shared_budgets_with_role(user_id: int) -> List[Tuple[SharedBudget, str]]:
+        """Get (budget, user's role) pairs for all shared budgets user is member of.
+
+        One JOIN for budgets and roles; members are loaded in one more query
+        for SharedBudget.to_dict()'s member_count.
+        """
+        return (
+            db.session.query(SharedBudget, SharedBudgetMember.role)
+            .join(SharedBudgetMember, SharedBudgetMember.budget_id == SharedBudget.id)
+            .filter(SharedBudgetMember.user_id == user_id)
+            .options(selectinload(SharedBudget.members))
+            .all()
+        )
+    
     @staticmethod
     def get_budget_members(budget_id: int) -> List[SharedBudgetMember]:
         """Get all members of shared budget."""
@@ -234,7 +250,7 @@ class SharedBudgetService:
         db.session.delete(member_to_remove)
         db.session.commit()
         
-        current_app.logger.info(f'Removed user {user_id} from shared budget {budget_id}')
+        current_app.logger.info('Removed user %s from shared budget %s', user_id, budget_id)
         return True
     
     @staticmethod
@@ -270,7 +286,7 @@ class SharedBudgetService:
         member.role = new_role
         db.session.commit()
         
-        current_app.logger.info(f'Updated user {user_id} role to {new_role} in shared budget {budget_id}')
+        current_app.logger.info('Updated user %s role to %s in shared budget %s', user_id, new_role, budget_id)
         return True
     
     @staticmethod
@@ -283,7 +299,7 @@ class SharedBudgetService:
         db.session.delete(budget)
         db.session.commit()
         
-        current_app.logger.info(f'Deleted shared budget {budget_id} by user {user_id}')
+        current_app.logger.info('Deleted shared budget %s by user %s', budget_id, user_id)
         return True
     
     @staticmethod
@@ -61,7 +61,7 @@ def api_issues():
 def create_issue():
     """Create new issue."""
     if request.method == 'POST':
-        data = request.get_json() if request.is_json else request.form
+        data = request.get_json(cache=False) if request.is_json else request.form
         
         try:
             issue = Issue(
@@ -111,7 +111,7 @@ def view_issue(issue_id):
 def update_issue(issue_id):
     """Update issue."""
     issue = Issue.query.get_or_404(issue_id)
-    data = request.get_json() if request.is_json else request.form
+    data = request.get_json(cache=False) if request.is_json else request.form
     
     try:
         # Update fields
@@ -169,7 +169,7 @@ def update_issue(issue_id):
 def add_comment(issue_id):
     """Add comment to issue."""
     issue = Issue.query.get_or_404(issue_id)
-    data = request.get_json() if request.is_json else request.form
+    data = request.get_json(cache=False) if request.is_json else request.form
     
     try:
         comment = IssueComment(
@@ -0,0 +1,45 @@
+"""Add (user_id, date, category_id) index to expenses
+
+Revision ID: add_expenses_user_date_category_index
+Revises: add_user_id_indexes
+Create Date: 2025-10-05 00:10:00.000000
+
+"""
+from alembic import op
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = 'add_expenses_user_date_category_index'
+down_revision = 'add_user_id_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Replace ix_expenses_user_id with a composite index led by user_id."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    if 'expenses' not in inspector.get_table_names():
+        return
+
+    existing = {ix['name'] for ix in inspector.get_indexes('expenses')}
+    if 'ix_expenses_user_date_category' not in existing:
+        op.create_index('ix_expenses_user_date_category', 'expenses', ['user_id', 'date', 'category_id'])
+        print("✓ Created index ix_expenses_user_date_category")
+    # The composite index covers every user_id-only lookup
+    if 'ix_expenses_user_id' in existing:
+        op.drop_index('ix_expenses_user_id', table_name='expenses')
+
+
+def downgrade():
+    """Restore the single-column user_id index."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    if 'expenses' not in inspector.get_table_names():
+        return
+
+    existing = {ix['name'] for ix in inspector.get_indexes('expenses')}
+    if 'ix_expenses_user_id' not in existing:
+        op.create_index('ix_expenses_user_id', 'expenses', ['user_id'])
+    if 'ix_expenses_user_date_category' in existing:
+        op.drop_index('ix_expenses_user_date_category', table_name='expenses')
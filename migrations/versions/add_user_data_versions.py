@@ -0,0 +1,41 @@
+"""Add user_data_versions table
+
+Revision ID: add_user_data_versions
+Revises: add_expenses_user_date_category_index
+Create Date: 2025-10-05 00:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_data_versions'
+down_revision = 'add_expenses_user_date_category_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create the shared store for budget data versions."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    if 'user_data_versions' in inspector.get_table_names():
+        return
+
+    op.create_table(
+        'user_data_versions',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    print("✓ Created table user_data_versions")
+
+
+def downgrade():
+    """Drop the data version table."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    if 'user_data_versions' in inspector.get_table_names():
+        op.drop_table('user_data_versions')
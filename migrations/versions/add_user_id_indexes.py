@@ -0,0 +1,47 @@
+"""Add user_id indexes to expenses and savings_goals
+
+Revision ID: add_user_id_indexes
+Revises: fix_income_table_structure
+Create Date: 2025-10-05 00:00:00.000000
+
+"""
+from alembic import op
+from sqlalchemy.engine.reflection import Inspector
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_id_indexes'
+down_revision = 'fix_income_table_structure'
+branch_labels = None
+depends_on = None
+
+# categories and income are already covered by their (user_id, ...) unique constraints
+INDEXES = (
+    ('ix_expenses_user_id', 'expenses'),
+    ('ix_savings_goals_user_id', 'savings_goals'),
+)
+
+
+def upgrade():
+    """Index per-user lookups on the largest tables."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    tables = set(inspector.get_table_names())
+
+    for index_name, table in INDEXES:
+        if table not in tables:
+            continue
+        existing = {ix['name'] for ix in inspector.get_indexes(table)}
+        if index_name not in existing:
+            op.create_index(index_name, table, ['user_id'])
+            print(f"✓ Created index {index_name}")
+
+
+def downgrade():
+    """Drop the user_id indexes."""
+    conn = op.get_bind()
+    inspector = Inspector.from_engine(conn)
+    tables = set(inspector.get_table_names())
+
+    for index_name, table in INDEXES:
+        if table in tables and index_name in {ix['name'] for ix in inspector.get_indexes(table)}:
+            op.drop_index(index_name, table_name=table)
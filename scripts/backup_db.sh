@@ -40,8 +40,15 @@ DB_SIZE=$(du -h "$DB_PATH" | cut -f1)
 echo -e "Database size: ${GREEN}$DB_SIZE${NC}"
 
 # Create backup
+# The database runs in WAL mode: recent commits may still sit in budget.db-wal,
+# so take a consistent snapshot through SQLite instead of copying the file
 echo -e "${YELLOW}Creating backup...${NC}"
-cp "$DB_PATH" "$BACKUP_FILE"
+if command -v sqlite3 &> /dev/null; then
+    sqlite3 "$DB_PATH" ".backup '$BACKUP_FILE'"
+else
+    python3 -c 'import sqlite3, sys; sqlite3.connect(sys.argv[1]).backup(sqlite3.connect(sys.argv[2]))' \
+        "$DB_PATH" "$BACKUP_FILE"
+fi
 
 if [ -f "$BACKUP_FILE" ]; then
     echo -e "${GREEN}✅ Backup created successfully!${NC}"
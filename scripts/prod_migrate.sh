@@ -107,6 +107,8 @@ else
     # Find latest backup
     LATEST_BACKUP=$(ls -t /var/lib/crystalbudget/backups/budget_backup_*.db 2>/dev/null | head -1)
     if [ -n "$LATEST_BACKUP" ]; then
+        # Drop WAL/shm files of the failed run so they are not replayed onto the backup
+        rm -f "$DB_PATH-wal" "$DB_PATH-shm"
         cp "$LATEST_BACKUP" "$DB_PATH"
         echo -e "${GREEN}✅ Database restored from backup${NC}"
     else
@@ -154,6 +156,6 @@ echo "3. Check database: flask db current"
 echo ""
 echo -e "${YELLOW}If something went wrong:${NC}"
 echo "1. Stop service: sudo systemctl stop $SERVICE_NAME"
-echo "2. Restore backup: cp /var/lib/crystalbudget/backups/budget_backup_*.db $DB_PATH"
+echo "2. Restore backup: rm -f $DB_PATH-wal $DB_PATH-shm && cp /var/lib/crystalbudget/backups/budget_backup_*.db $DB_PATH"
 echo "3. Downgrade: flask db downgrade -1"
 echo "4. Start service: sudo systemctl start $SERVICE_NAME"
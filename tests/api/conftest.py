@@ -4,9 +4,16 @@ import requests
 import os
 import json
 from datetime import datetime, date
+from decimal import Decimal
 import tempfile
 import sqlite3
 
+# The in-process app fixtures below use their own throwaway database; the URI
+# is read when app.core.config is imported, so set it before any app import
+_APP_DB_FILE = tempfile.mktemp(suffix='.db')
+os.environ['BUDGET_DB'] = f'sqlite:///{_APP_DB_FILE}'
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+
 
 @pytest.fixture(scope="session")
 def api_base_url():
@@ -198,4 +205,73 @@ class APITestHelpers:
 @pytest.fixture
 def helpers():
     """Provide API test helpers."""
-    return APITestHelpers
\ No newline at end of file
+    return APITestHelpers
+
+
+@pytest.fixture(scope="session")
+def app():
+    """Flask app (testing config) for in-process API tests."""
+    from app import create_app
+    
+    flask_app = create_app('testing')
+    yield flask_app
+    
+    if os.path.exists(_APP_DB_FILE):
+        os.unlink(_APP_DB_FILE)
+
+
+@pytest.fixture
+def db(app):
+    """Fresh schema for each test."""
+    from app.core.extensions import cache, db as _db
+    
+    with app.app_context():
+        # Start from an empty file: drop_all cannot order the users <->
+        # shared_budgets foreign key cycle on SQLite
+        _db.engine.dispose()
+        if os.path.exists(_APP_DB_FILE):
+            os.unlink(_APP_DB_FILE)
+        _db.create_all()
+        cache.clear()
+        yield _db
+        _db.session.remove()
+
+
+@pytest.fixture
+def budget_user(db):
+    """User with three categories and 25 expenses in October 2025."""
+    from app.modules.auth.models import User
+    from app.modules.budget.models import Category, Expense, Income
+    
+    user = User(email='api@test.local', name='API User', password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    
+    categories = [
+        Category(user_id=user.id, name=f'Категория {i}', limit_type='fixed', value=Decimal('100'))
+        for i in range(3)
+    ]
+    db.session.add_all(categories)
+    db.session.flush()
+    
+    for i in range(25):
+        db.session.add(Expense(
+            user_id=user.id, category_id=categories[i % 3].id, amount=Decimal(i + 1),
+            description=f'Расход {i}', date=date(2025, 10, 1 + i), month='2025-10'
+        ))
+    db.session.add(Income(
+        user_id=user.id, source_name='Зарплата', amount=Decimal('1000'),
+        date=date(2025, 10, 1), year=2025, month=10
+    ))
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, budget_user):
+    """Test client logged in as budget_user."""
+    test_client = app.test_client()
+    with test_client.session_transaction() as sess:
+        sess['_user_id'] = str(budget_user.id)
+        sess['user_id'] = budget_user.id
+    return test_client
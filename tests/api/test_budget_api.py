@@ -0,0 +1,212 @@
+"""In-process tests for the v1 budget API."""
+from datetime import date
+from decimal import Decimal
+
+
+class TestBudgetSummary:
+    """Month snapshot endpoints."""
+    
+    def test_summary_counts_expenses_per_category(self, client):
+        response = client.get('/api/v1/budget/summary?ym=2025-10')
+        
+        assert response.status_code == 200
+        categories = response.get_json()['data']['categories']
+        assert [c['expenses_count'] for c in categories] == [9, 8, 8]
+        assert categories[0]['spent']['amount'] == 117.0
+    
+    def test_cached_snapshot_follows_currency(self, client):
+        for currency in ('USD', 'EUR'):
+            with client.session_transaction() as sess:
+                sess['currency'] = currency
+            response = client.get('/api/v1/budget/summary?ym=2025-10')
+            
+            assert response.get_json()['data']['categories'][0]['spent']['currency'] == currency
+    
+    def test_dashboard_returns_summary_expenses_and_income(self, client):
+        response = client.get('/api/v1/budget/dashboard?ym=2025-10&limit=5')
+        
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        assert data['year_month'] == '2025-10'
+        assert len(data['summary']['categories']) == 3
+        assert [e['id'] for e in data['expenses']['expenses']] == [25, 24, 23, 22, 21]
+        assert data['expenses']['pagination']['has_more'] is True
+        assert data['income']['total']['amount'] == 1000.0
+
+
+def _expense_ids(response):
+    return [e['id'] for e in response.get_json()['data']['expenses']]
+
+
+class TestExpensePaging:
+    """Keyset cursor, offset and limit handling on /expenses."""
+    
+    def test_first_page_fetches_one_extra_row_for_has_more(self, client):
+        response = client.get('/api/v1/expenses?ym=2025-10&limit=10')
+        
+        assert response.status_code == 200
+        pagination = response.get_json()['data']['pagination']
+        assert _expense_ids(response) == list(range(25, 15, -1))
+        assert pagination['has_more'] is True
+        assert pagination['next_cursor']
+        assert 'total' not in pagination
+    
+    def test_cursor_walks_all_pages(self, client):
+        ids, cursor = [], None
+        for _ in range(3):
+            url = '/api/v1/expenses?ym=2025-10&limit=10'
+            if cursor:
+                url += f'&cursor={cursor}'
+            response = client.get(url)
+            assert response.status_code == 200
+            ids += _expense_ids(response)
+            cursor = response.get_json()['data']['pagination']['next_cursor']
+        
+        assert ids == list(range(25, 0, -1))
+        assert cursor is None
+    
+    def test_exact_page_has_no_more(self, client):
+        response = client.get('/api/v1/expenses?ym=2025-10&limit=25')
+        
+        assert len(_expense_ids(response)) == 25
+        assert response.get_json()['data']['pagination']['has_more'] is False
+    
+    def test_offset_paging(self, client):
+        response = client.get('/api/v1/expenses?ym=2025-10&limit=10&offset=20')
+        
+        assert _expense_ids(response) == [5, 4, 3, 2, 1]
+        pagination = response.get_json()['data']['pagination']
+        assert pagination['offset'] == 20
+        assert pagination['has_more'] is False
+    
+    def test_with_total_counts_filtered_rows(self, client):
+        response = client.get('/api/v1/expenses?ym=2025-10&category_id=1&limit=5&with_total=1')
+        
+        pagination = response.get_json()['data']['pagination']
+        assert pagination['total'] == 9
+        assert _expense_ids(response) == [25, 22, 19, 16, 13]
+    
+    def test_limit_is_clamped(self, client):
+        response = client.get('/api/v1/expenses?ym=2025-10&limit=0')
+        assert response.status_code == 200
+        assert _expense_ids(response) == [25]
+        
+        response = client.get('/api/v1/expenses?ym=2025-10&limit=100000')
+        assert response.get_json()['data']['pagination']['limit'] == 200
+    
+    def test_negative_offset_is_rejected(self, client):
+        response = client.get('/api/v1/expenses?ym=2025-10&offset=-1')
+        
+        assert response.status_code == 400
+    
+    def test_malformed_cursor_is_rejected(self, client):
+        response = client.get('/api/v1/expenses?ym=2025-10&cursor=zzz')
+        
+        assert response.status_code == 400
+
+
+class TestExpenseUpdate:
+    """Partial PUT writes only the fields that change."""
+    
+    def test_partial_update_keeps_other_fields(self, client, db):
+        from app.modules.budget.models import Expense
+        
+        response = client.put('/api/v1/expenses/1', json={'description': 'Новое'})
+        
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        assert data['description'] == 'Новое'
+        assert data['amount'] == 1.0
+        assert data['date'] == '2025-10-01'
+        
+        db.session.expire_all()
+        expense = db.session.get(Expense, 1)
+        assert expense.description == 'Новое'
+        assert expense.category_id == 1
+    
+    def test_unchanged_update_skips_the_write(self, client):
+        etag = client.get('/api/v1/budget/summary?ym=2025-10').headers['ETag']
+        
+        response = client.put('/api/v1/expenses/1', json={'amount': 1, 'description': 'Расход 0'})
+        
+        assert response.status_code == 200
+        assert client.get('/api/v1/budget/summary?ym=2025-10').headers['ETag'] == etag
+    
+    def test_missing_expense_is_404(self, client):
+        response = client.put('/api/v1/expenses/999', json={'description': 'x'})
+        
+        assert response.status_code == 404
+
+
+class TestConditionalGet:
+    """ETag / If-None-Match handling on budget reads."""
+    
+    def test_repeat_get_is_not_modified(self, client):
+        first = client.get('/api/v1/budget/summary?ym=2025-10')
+        etag = first.headers['ETag']
+        assert etag.startswith('W/')
+        
+        second = client.get('/api/v1/budget/summary?ym=2025-10', headers={'If-None-Match': etag})
+        
+        assert second.status_code == 304
+        assert second.data == b''
+        assert second.headers['ETag'] == etag
+    
+    def test_etag_differs_per_query(self, client):
+        first = client.get('/api/v1/expenses?ym=2025-10&limit=5')
+        second = client.get('/api/v1/expenses?ym=2025-10&limit=6')
+        
+        assert first.headers['ETag'] != second.headers['ETag']
+    
+    def test_write_changes_etag(self, client):
+        etag = client.get('/api/v1/budget/summary?ym=2025-10').headers['ETag']
+        
+        created = client.post('/api/v1/expenses', json={
+            'category_id': 2, 'amount': 50, 'date': '2025-10-26', 'description': 'Новый'
+        })
+        assert created.status_code == 201
+        
+        response = client.get('/api/v1/budget/summary?ym=2025-10', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        categories = response.get_json()['data']['categories']
+        assert [c['expenses_count'] for c in categories] == [9, 9, 8]
+    
+    def test_currency_change_changes_etag(self, client):
+        for url in ('/api/v1/budget/summary?ym=2025-10', '/api/v1/budget/dashboard?ym=2025-10'):
+            with client.session_transaction() as sess:
+                sess['currency'] = 'USD'
+            etag = client.get(url).headers['ETag']
+            
+            with client.session_transaction() as sess:
+                sess['currency'] = 'EUR'
+            response = client.get(url, headers={'If-None-Match': etag})
+            
+            assert response.status_code == 200
+            assert response.headers['ETag'] != etag
+    
+    def test_family_member_write_changes_etag(self, client, db, budget_user):
+        from app.modules.auth.models import User
+        from app.modules.budget.models import Expense
+        from app.modules.goals.models import SharedBudget
+        
+        shared = SharedBudget(name='Семья', creator_id=budget_user.id, invite_code='FAM001')
+        db.session.add(shared)
+        db.session.flush()
+        member = User(email='member@test.local', name='Member', password_hash='x',
+                      shared_budget_id=shared.id)
+        budget_user.shared_budget_id = shared.id
+        db.session.add(member)
+        db.session.commit()
+        
+        etag = client.get('/api/v1/expenses?ym=2025-10&limit=5').headers['ETag']
+        
+        db.session.add(Expense(
+            user_id=member.id, category_id=1, amount=Decimal('7'), description='Чужой',
+            date=date(2025, 10, 28), month='2025-10'
+        ))
+        db.session.commit()
+        
+        response = client.get('/api/v1/expenses?ym=2025-10&limit=5', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()['data']['expenses'][0]['description'] == 'Чужой'
@@ -0,0 +1,54 @@
+"""The orjson provider must encode API payloads like Flask's default one."""
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from app.core.json_provider import OrjsonProvider
+from app.core.time import YearMonth
+
+
+PAYLOADS = [
+    {'success': True, 'data': {'b': 1, 'a': [1.5, None, 'текст']}},
+    {'amount': Decimal('12.50'), 'id': uuid.UUID(int=1)},
+    {'date': date(2025, 10, 1), 'created_at': datetime(2025, 10, 1, 12, 30)},
+    {'year_month': YearMonth(2024, 1)},
+    {1: 'int key', 2: {3: [YearMonth(2025, 12)]}},
+    {'big': 2 ** 70},
+]
+
+
+@pytest.fixture
+def providers(app):
+    return OrjsonProvider(app), DefaultJSONProvider(app)
+
+
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_dumps_matches_default_provider(providers, payload):
+    orjson_provider, default_provider = providers
+    
+    assert json.loads(orjson_provider.dumps(payload)) == json.loads(default_provider.dumps(payload))
+
+
+@pytest.mark.parametrize('payload', PAYLOADS)
+def test_response_matches_default_provider(app, providers, payload):
+    orjson_provider, default_provider = providers
+    
+    with app.app_context():
+        body = orjson_provider.response(payload).get_data()
+        expected = default_provider.response(payload).get_data()
+    
+    assert json.loads(body) == json.loads(expected)
+
+
+def test_dumps_pins_known_output(providers):
+    orjson_provider, _ = providers
+    
+    payload = {'ym': YearMonth(2024, 1), 'amount': Decimal('1.20'), 'b': 1, 'a': date(2025, 1, 2)}
+    
+    assert orjson_provider.dumps(payload) == (
+        '{"a":"Thu, 02 Jan 2025 00:00:00 GMT","amount":"1.20","b":1,"ym":[2024,1]}'
+    )